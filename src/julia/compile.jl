@@ -1,4 +1,5 @@
-compiler_env, script, output, base_sysimage = ARGS
+compiler_env, script, output, base_sysimage, statements_file, stage1_sysimage, project, packages,
+cpu_target, slim, pycall_version, refresh_stage1 = ARGS
 
 if VERSION < v"0.7-"
     error("Unsupported Julia version $VERSION")
@@ -11,42 +12,149 @@ Pkg.activate(compiler_env)
 @info "Loading PackageCompiler..."
 using PackageCompiler
 
-@info "Installing PyCall..."
+"""
+    copy_project(src, dst)
+
+Copy the project file and the manifest of the project at `src` to `dst`.
+Relative `path` of the packages in the manifest (e.g., the packages added
+by `Pkg.develop`) is resolved with respect to `src`.
+"""
+function copy_project(src, dst)
+    for name in ("JuliaProject.toml", "Project.toml")
+        if isfile(joinpath(src, name))
+            cp(joinpath(src, name), joinpath(dst, "Project.toml"))
+            break
+        end
+    end
+    for name in ("JuliaManifest.toml", "Manifest.toml")
+        isfile(joinpath(src, name)) || continue
+        manifest = Pkg.TOML.parsefile(joinpath(src, name))
+        entries = haskey(manifest, "manifest_format") ? manifest["deps"] : manifest
+        for (_, infos) in entries
+            infos isa Vector || continue
+            for info in infos
+                if haskey(info, "path")
+                    info["path"] = abspath(src, info["path"])
+                end
+            end
+        end
+        open(joinpath(dst, "Manifest.toml"), "w") do io
+            Pkg.TOML.print(io, manifest)
+        end
+        break
+    end
+end
+
+project_deps() =
+    isfile("Project.toml") ? get(Pkg.TOML.parsefile("Project.toml"), "deps", Dict()) :
+    Dict()
+
+const extra_packages = String.(filter(!isempty, split(packages, ",")))
+
+if !isempty(project)
+    # Copy the project so that adding PyCall does not modify it:
+    @info "Using project $project"
+    copy_project(project, ".")
+end
 Pkg.activate(".")
-Pkg.add([
-    Pkg.PackageSpec(
-        name = "PyCall",
-        uuid = "438e738f-606a-5dbb-bf0a-cddfbfd45ab0",
-    ),
-])
+if !isempty(project)
+    if isempty(extra_packages)
+        # Include all direct dependencies by default:
+        append!(extra_packages, keys(project_deps()))
+    end
+    Pkg.instantiate()
+end
+
+let deps = project_deps(),
+    specs = [Pkg.PackageSpec(name = name) for name in extra_packages if !haskey(deps, name)]
+
+    if !haskey(deps, "PyCall")
+        # Use the same PyCall as `julia` (the version is recorded in
+        # the cache key of the system image):
+        pin = isempty(pycall_version) ? () : (version = VersionNumber(pycall_version),)
+        push!(
+            specs,
+            Pkg.PackageSpec(;
+                name = "PyCall",
+                uuid = "438e738f-606a-5dbb-bf0a-cddfbfd45ab0",
+                pin...,
+            ),
+        )
+    end
+    if !isempty(specs)
+        @info "Installing $(join([spec.name for spec in specs], ", "))..."
+        Pkg.add(specs)
+    end
+end
+
+const sysimage_packages = unique(Symbol.(vcat(["PyCall"], extra_packages)))
+
+const statements_files = isempty(statements_file) ? String[] : [statements_file]
+
+# Keyword arguments to `create_sysimage` common to both stages:
+const sysimage_kwargs = Dict{Symbol,Any}()
+if !isempty(cpu_target)
+    # Use PackageCompiler's default (native CPU) otherwise:
+    sysimage_kwargs[:cpu_target] = cpu_target
+end
+if !isempty(slim)
+    # Only keep the stdlibs in the dependencies of the project "." (i.e.,
+    # PyCall and `extra_packages`):
+    sysimage_kwargs[:filter_stdlibs] = true
+end
+
+function create_stage1_sysimage(path)
+    @info "Compiling a temporary system image without `PyCall`..."
+    create_sysimage(
+        Symbol[];
+        sysimage_path = path,
+        project = ".",
+        base_sysimage = isempty(base_sysimage) ? nothing : base_sysimage,
+        sysimage_kwargs...,
+    )
+end
 
 if VERSION >= v"1.5-"
     mktempdir() do dir
-        tmpimg = joinpath(dir, basename(output))
-        @info "Compiling a temporary system image without `PyCall`..."
-        create_sysimage(
-            Symbol[];
-            sysimage_path = tmpimg,
-            project = ".",
-            base_sysimage = isempty(base_sysimage) ? nothing : base_sysimage,
-        )
+        if isempty(stage1_sysimage)
+            tmpimg = joinpath(dir, basename(output))
+            create_stage1_sysimage(tmpimg)
+        elseif isfile(stage1_sysimage) && isempty(refresh_stage1)
+            @info "Using cached system image without `PyCall`: $stage1_sysimage"
+            tmpimg = stage1_sysimage
+        else
+            # Create (or re-create) it next to the cache so that `mv` is
+            # an atomic rename:
+            cachedir = dirname(stage1_sysimage)
+            mkpath(cachedir)
+            mktempdir(cachedir) do stage1dir
+                path = joinpath(stage1dir, basename(stage1_sysimage))
+                create_stage1_sysimage(path)
+                mv(path, stage1_sysimage; force = true)
+            end
+            tmpimg = stage1_sysimage
+        end
         @info "Compiling system image..."
         create_sysimage(
-            [:PyCall];
+            sysimage_packages;
             sysimage_path = output,
             project = ".",
             precompile_execution_file = script,
+            precompile_statements_file = statements_files,
             base_sysimage = tmpimg,
+            sysimage_kwargs...,
         )
     end
 else
     @info "Compiling system image..."
     create_sysimage(
-        [:PyCall],
+        sysimage_packages,
         sysimage_path = output,
         project = ".",
         precompile_execution_file = script,
-        base_sysimage = isempty(base_sysimage) ? nothing : base_sysimage,
+        precompile_statements_file = statements_files,
+        base_sysimage = isempty(base_sysimage) ? nothing : base_sysimage;
+        sysimage_kwargs...,
     )
 end
 
@@ -62,7 +170,10 @@ end
 #
 #   1.   The first stage is monkey-patching as done before but without
 #       PyCall. This way, we don't get the error because julia does not
-#       try to precompile any packages.
+#       try to precompile any packages.  Since this stage only depends on
+#       the Julia version, the base system image, `julia-py` and
+#       PackageCompiler, it is cached at the path `stage1_sysimage`
+#       given by `julia.sysimage` (unless it is empty).
 #
 #   2.   The second stage is the inclusion of PyCall. At this point, we are
 #       in a monkey-patched system image. So, it's possible to precompile
@@ -20,6 +20,7 @@ import ctypes
 import ctypes.util
 import logging as _logging  # see `.logger`
 import os
+import subprocess
 import sys
 import textwrap
 import warnings
@@ -34,7 +35,9 @@ from .juliainfo import JuliaInfo
 from .libjulia import UNBOXABLE_TYPES, LibJulia, get_inprocess_libjulia, get_libjulia
 from .options import JuliaOptions, options_docs
 from .release import __version__
-from .utils import PYCALL_PKGID, is_windows
+from .startup_profile import StartupProfile
+from .sysimage_registry import lookup_sysimage
+from .utils import PYCALL_PKGID, cache_dir, env_disabled, file_lock, is_windows
 
 try:
     from shutil import which
@@ -344,14 +347,22 @@ Your Python interpreter "{sys.executable}"
 is statically linked to libpython.  Currently, PyJulia does not fully
 support such Python interpreter.
 
-The easiest workaround is to pass `compiled_modules=False` to `Julia`
+PyJulia tries to build a system image for such Python interpreter
+automatically unless the environment variable `PYJULIA_AUTO_SYSIMAGE`
+is set to `no`.  To build it manually, run
+
+    $ python3 -m julia.sysimage sys.so
+
+and then pass `sysimage="sys.so"` to `Julia` constructor.
+
+Another workaround is to pass `compiled_modules=False` to `Julia`
 constructor.  To do so, first *reboot* your Python REPL (if this happened
 inside an interactive session) and then evaluate:
 
     >>> from julia.api import Julia
     >>> jl = Julia(compiled_modules=False)
 
-Another workaround is to run your Python script with `python-jl`
+Alternatively, you can run your Python script with `python-jl`
 command bundled in PyJulia.  You can simply do:
 
     $ python-jl PATH/TO/YOUR/SCRIPT.py
@@ -392,6 +403,65 @@ class UnsupportedPythonError(Exception):
         )
 
 
+def auto_sysimage_enabled(environ=os.environ):
+    """
+    Check if a system image may be built for statically linked Python.
+
+    >>> auto_sysimage_enabled({})
+    True
+    >>> auto_sysimage_enabled({"PYJULIA_AUTO_SYSIMAGE": "no"})
+    False
+    """
+    return not env_disabled("PYJULIA_AUTO_SYSIMAGE", environ)
+
+
+def build_static_python_sysimage(jlinfo):
+    """
+    Build (or reuse) a system image for this statically linked Python.
+
+    The system image contains PyCall and the packages in the project
+    specified by ``JULIA_PROJECT`` (if any).  It is registered so that
+    the next `Julia` finds it without building (see
+    `julia.sysimage_registry`).
+    """
+    # Imported here since `.sysimage` imports this module:
+    from .sysimage import build_sysimage, matrix_sysimage_name
+    from .sysimage_registry import active_project
+
+    output = cache_dir("sysimages", "static-python", matrix_sysimage_name(jlinfo, None))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with file_lock(output + ".lock"):
+        # Another process may have built it while we were waiting:
+        sysimage = lookup_sysimage(jlinfo)
+        if sysimage is not None:
+            return sysimage
+        logger.warning(
+            "Python interpreter %s is statically linked to libpython.  "
+            "Building a system image for it.  This may take a while...",
+            sys.executable,
+        )
+        try:
+            build = build_sysimage(output, julia=jlinfo.julia, project=active_project())
+        except (RuntimeError, subprocess.CalledProcessError) as err:
+            # `RuntimeError` includes `KnownError` and missing ``julia-py``.
+            logger.error("Failed to build a system image: %s", err)
+            raise UnsupportedPythonError(jlinfo)
+    return build.cached
+
+
+def trace_compile_path(trace_dir):
+    """
+    Path to a file in `trace_dir` to which precompile statements are written.
+
+    The file name includes the process ID so that concurrent processes
+    do not overwrite each other's statements.
+    """
+    os.makedirs(trace_dir, exist_ok=True)
+    return os.path.realpath(
+        os.path.join(trace_dir, "precompile-{}.jl".format(os.getpid()))
+    )
+
+
 class Julia(object):
     """
     Implements a bridge to the Julia runtime.
@@ -428,12 +498,30 @@ class Julia(object):
 
         debug : bool
             If True, print some debugging information to STDERR
+            (including `startup_profile`).
+
+        If `sysimage` is not given, the system image registered by
+        `julia.sysimage` for this Julia, Python and ``JULIA_PROJECT`` is
+        used if any (see `julia.sysimage_registry`).  If there is none
+        and this Python is statically linked to libpython, a system
+        image is built (unless ``PYJULIA_AUTO_SYSIMAGE=no``).
+
+        Attributes
+        ==========
+
+        startup_profile : StartupProfile
+            Wall time and allocation of each phase of the initialization.
+            Use ``startup_profile.as_dict()`` or
+            ``startup_profile.to_json()`` to retrieve them.
         """
         # Note: `options_docs` is appended below (top level)
 
         if debug:
             enable_debug()
 
+        self.startup_profile = profile = StartupProfile()
+        get_api = lambda: getattr(self, "api", None)
+
         if jl_runtime_path is not None:
             warnings.warn(
                 "`jl_runtime_path` is deprecated. Please use `runtime`.", FutureWarning
@@ -471,15 +559,27 @@ class Julia(object):
             # Use pre-existing `LibJulia`.
             self.api = get_libjulia()
         elif init_julia:
-            jlinfo = JuliaInfo.load(runtime)
+            with profile.phase("juliainfo"):
+                jlinfo = JuliaInfo.load(runtime)
             if jlinfo.version_info < (0, 7):
                 raise RuntimeError("PyJulia does not support Julia < 0.7 anymore")
 
-            self.api = LibJulia.from_juliainfo(jlinfo)
+            with profile.phase("dlopen"):
+                self.api = LibJulia.from_juliainfo(jlinfo)
 
             if jl_init_path:
                 self.api.bindir = jl_init_path
 
+            trace_dir = os.environ.get("PYJULIA_TRACE_COMPILE")
+            if trace_dir and "trace_compile" not in julia_options:
+                julia_options["trace_compile"] = trace_compile_path(trace_dir)
+
+            if "sysimage" not in julia_options:
+                with profile.phase("sysimage_lookup"):
+                    sysimage = lookup_sysimage(jlinfo)
+                if sysimage is not None:
+                    julia_options["sysimage"] = sysimage
+
             options = JuliaOptions(**julia_options)
 
             is_compatible_python = jlinfo.is_compatible_python()
@@ -492,9 +592,16 @@ class Julia(object):
                 or is_compatible_python
                 or use_custom_sysimage
             ):
-                raise UnsupportedPythonError(jlinfo)
+                if not (
+                    determine_if_statically_linked() and auto_sysimage_enabled()
+                ):
+                    raise UnsupportedPythonError(jlinfo)
+                with profile.phase("sysimage_build"):
+                    julia_options["sysimage"] = build_static_python_sysimage(jlinfo)
+                options = JuliaOptions(**julia_options)
 
-            self.api.init_julia(options)
+            with profile.phase("init", get_api):
+                self.api.init_julia(options)
 
             # We are assuming that `jl_is_initialized()` was true only
             # if this process was a Julia process (hence PyCall had
@@ -512,40 +619,46 @@ class Julia(object):
 
         # Currently, PyJulia assumes that `Main.PyCall` exsits.  Thus, we need
         # to import `PyCall` again here in case `init_julia=False` is passed:
-        if debug:
-            self._call("""
-            const PyCall = try
-                Base.require({0})
-            catch err
-                @error "Failed to import PyCall" exception = (err, catch_backtrace())
-                rethrow()
-            end
-            """.format(PYCALL_PKGID))
-        else:
-            self._call("const PyCall = Base.require({0})".format(PYCALL_PKGID))
+        with profile.phase("pycall", get_api):
+            if debug:
+                self._call("""
+                const PyCall = try
+                    Base.require({0})
+                catch err
+                    @error "Failed to import PyCall" exception = (err, catch_backtrace())
+                    rethrow()
+                end
+                """.format(PYCALL_PKGID))
+            else:
+                self._call("const PyCall = Base.require({0})".format(PYCALL_PKGID))
 
-        self._call(u"using .PyCall")
+            self._call(u"using .PyCall")
 
         # Whether we initialized Julia or not, we MUST create at least one
         # instance of PyObject and the convert function. Since these will be
         # needed on every call, we hold them in the Julia object itself so
         # they can survive across reinitializations.
-        self._PyObject = self._call("PyCall.PyObject")
-        self._convert = self._call("convert")
-
-        self.sprint = self.eval('sprint')
-        self.showerror = self.eval('showerror')
-
-        if self.eval('VERSION >= v"0.7-"'):
-            self.eval("@eval Main import Base.MainInclude: eval, include")
-            # https://github.com/JuliaLang/julia/issues/28825
-
-        if not self._isdefined("Main", "_PyJuliaHelper"):
-            self.eval("include")(
-                os.path.join(
-                    os.path.dirname(os.path.realpath(__file__)), "pyjulia_helper.jl"
+        with profile.phase("first_eval", get_api):
+            self._PyObject = self._call("PyCall.PyObject")
+            self._convert = self._call("convert")
+
+            self.sprint = self.eval('sprint')
+            self.showerror = self.eval('showerror')
+
+            if self.eval('VERSION >= v"0.7-"'):
+                self.eval("@eval Main import Base.MainInclude: eval, include")
+                # https://github.com/JuliaLang/julia/issues/28825
+
+        with profile.phase("helper", get_api):
+            if not self._isdefined("Main", "_PyJuliaHelper"):
+                self.eval("include")(
+                    os.path.join(
+                        os.path.dirname(os.path.realpath(__file__)),
+                        "pyjulia_helper.jl",
+                    )
                 )
-            )
+
+        logger.debug("Startup profile:\n%s", profile.format())
 
     def _call(self, src):
         """
@@ -557,8 +670,9 @@ class Julia(object):
         expressions, only to execute statements.
         """
         # logger.debug("_call(%s)", src)
-        ans = self.api.jl_eval_string(src.encode('utf-8'))
-        self.check_exception(src)
+        with self.api.gc_unsafe():
+            ans = self.api.jl_eval_string(src.encode('utf-8'))
+            self.check_exception(src)
 
         return ans
 
@@ -630,14 +744,15 @@ class Julia(object):
         """ Execute code in Julia, then pull some results back to Python. """
         if src is None:
             return None
-        ans = self._call(src)
-        if not ans:
-            return None
-        res = self.api.jl_call2(self._convert, self._PyObject, ans)
-
-        if res is None:
-            self.check_exception("convert(PyCall.PyObject, {})".format(src))
-        return self._as_pyobj(res)
+        with self.api.gc_unsafe():
+            ans = self._call(src)
+            if not ans:
+                return None
+            res = self.api.jl_call2(self._convert, self._PyObject, ans)
+
+            if res is None:
+                self.check_exception("convert(PyCall.PyObject, {})".format(src))
+            return self._as_pyobj(res)
 
     def _as_pyobj(self, res):
         if res == 0:
@@ -1,4 +1,4 @@
-compiler_env, = ARGS
+compiler_env, packagecompiler_version = ARGS
 
 if VERSION < v"0.7-"
     error("Unsupported Julia version $VERSION")
@@ -26,7 +26,7 @@ Pkg.add([
     Pkg.PackageSpec(
         name = "PackageCompiler",
         uuid = "9b87118b-4619-50d2-8e1e-99f35a4d4d9d",
-        version = "1",
+        version = packagecompiler_version,
     )
 ])
 cat_build_log(Base.PkgId(
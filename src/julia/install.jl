@@ -1,4 +1,4 @@
-OP, python, libpython = ARGS
+OP, python, libpython, infofile = ARGS
 
 # Special exit codes for this script.
 # (see: https://www.tldp.org/LDP/abs/html/exitcodes.html)
@@ -70,6 +70,20 @@ function build_pycall()
     end
 end
 
+# Record what `julia.install` needs for skipping the next run (see
+# `julia.tools.install_fingerprint`):
+function write_install_info()
+    isempty(infofile) && return
+    modpath = Base.locate_package(pkgid)
+    depsfile = modpath === nothing ? "" :
+        normpath(joinpath(dirname(modpath), "..", "deps", "deps.jl"))
+    open(infofile, "w") do io
+        println(io, VERSION)
+        println(io, something(Base.active_project(), ""))
+        println(io, depsfile)
+    end
+end
+
 if OP == "build"
     build_pycall()
 elseif PyCall.python == python || PyCall.libpython == libpython
@@ -83,6 +97,7 @@ elseif PyCall.python == python || PyCall.libpython == libpython
         python: $python
         libpython: $libpython
     """
+    write_install_info()
     exit(code_no_precompile_needed)
 else
     if PyCall.python !== nothing
@@ -118,3 +133,5 @@ else
         Pkg.add("PyCall")
     end
 end
+
+write_install_info()
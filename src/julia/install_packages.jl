@@ -0,0 +1,49 @@
+# Install and precompile packages for `julia.install(packages=...)`.
+#
+#     julia [--project=PROJECT] install_packages.jl OP INSTANTIATE [PACKAGE ...]
+#
+# OP is "resolve" (instantiate the project if INSTANTIATE is non-empty
+# and add the packages, and PyCall if it is not installed, in one
+# operation) or "precompile" (precompile all packages in the project).
+
+OP = ARGS[1]
+instantiate = !isempty(ARGS[2])
+packages = ARGS[3:end]
+
+const Pkg =
+    Base.require(Base.PkgId(Base.UUID("44cfe95a-1eb2-52ea-b672-e2afdf69b78f"), "Pkg"))
+
+const pycall_pkgid = Base.PkgId(Base.UUID(0x438e738f_606a_5dbb_bf0a_cddfbfd45ab0), "PyCall")
+
+function package_spec(spec)
+    if occursin('@', spec)
+        name, version = split(spec, '@'; limit = 2)
+        return Pkg.PackageSpec(name = String(name), version = String(version))
+    end
+    return Pkg.PackageSpec(name = spec)
+end
+
+if OP == "resolve"
+    if instantiate
+        @info "Instantiating $(Base.active_project())..."
+        Pkg.instantiate()
+    end
+    specs = map(package_spec, packages)
+    if Base.locate_package(pycall_pkgid) === nothing && !any(s -> s.name == "PyCall", specs)
+        # Resolve PyCall together with the packages (it is built for
+        # `ENV["PYTHON"]` set by `julia.install`):
+        push!(specs, Pkg.PackageSpec(name = "PyCall", uuid = pycall_pkgid.uuid))
+    end
+    if !isempty(specs)
+        @info "Adding $(join([s.name for s in specs], ", "))..."
+        Pkg.add(specs)
+    end
+elseif OP == "precompile"
+    # Julia >= 1.6 precompiles the packages in parallel using
+    # `JULIA_NUM_PRECOMPILE_TASKS` tasks (default: number of CPU
+    # threads + 1).
+    @info "Precompiling packages in $(Base.active_project())..."
+    Pkg.precompile()
+else
+    error("Unknown operation: $OP")
+end
@@ -9,18 +9,52 @@ https://github.com/ipython/ipython/pull/10722
 from __future__ import absolute_import, print_function
 
 import re
+import time
+from collections import OrderedDict
 
 from IPython.core.completer import Completion, IPCompleter
 
+# Trailing part of the code which may be extended to a longer name:
+PARTIAL_NAME_RE = re.compile(r"[\w!]*$")
+
 
 class JuliaCompleter(object):
-    def __init__(self, julia=None):
+    """
+    Code completion for ``%julia`` and ``%%julia`` using ``REPL.completions``.
+
+    Results are cached by the code before the completed name and the
+    code after the cursor.  While more characters of a name are typed,
+    the cached results are narrowed down in Python instead of calling
+    Julia again.  The cache is invalidated when Julia's world age or
+    the names in ``Main`` change, unless querying Julia took longer
+    than `latency_budget` seconds in which case the stale results are
+    narrowed as well for at most `max_staleness` seconds after the
+    query.
+
+    Attributes
+    ----------
+    cache_size : int
+        Maximum number of cached completion contexts.  Set it to 0 to
+        disable the cache.
+    latency_budget : float
+        See above.
+    max_staleness : float
+        See above.
+    """
+
+    def __init__(
+        self, julia=None, cache_size=64, latency_budget=0.1, max_staleness=5.0
+    ):
         from julia import Julia
 
         self.julia = Julia() if julia is None else julia
         self.magic_re = re.compile(r".*(\s|^)%%?julia\s*")
         # With this regexp, "=%julia Cha<tab>" won't work.  But maybe
         # it's better to be conservative here.
+        self.cache_size = cache_size
+        self.latency_budget = latency_budget
+        self.max_staleness = max_staleness
+        self.cache = OrderedDict()
 
     @property
     def jlcomplete(self):
@@ -28,6 +62,57 @@ class JuliaCompleter(object):
 
         return completions
 
+    @property
+    def jlstate(self):
+        from julia.Main._PyJuliaHelper import completion_state
+
+        return completion_state
+
+    def cached_completions(self, jl_code, jl_pos, state):
+        """
+        Return ``(texts, start)`` narrowed from the cache or `None`.
+
+        `start` is the 0-origin position in `jl_code` of the name to be
+        completed.
+        """
+        before = jl_code[:jl_pos]
+        start = jl_pos - len(PARTIAL_NAME_RE.search(before).group())
+        key = (before[:start], jl_code[jl_pos:])
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        partial = before[start:]
+        if not partial.startswith(entry["partial"]):
+            return None
+        if entry["state"] != state and (
+            entry["query_time"] <= self.latency_budget
+            or time.monotonic() - entry["queried"] > self.max_staleness
+        ):
+            return None
+        texts = [t for t in entry["texts"] if t.startswith(partial)]
+        if not texts:
+            return None
+        self.cache.move_to_end(key)
+        return texts, start
+
+    def store(self, jl_code, jl_pos, texts, start, state, query_time):
+        partial = jl_code[start:jl_pos]
+        if self.cache_size <= 0 or PARTIAL_NAME_RE.match(partial).end() != len(partial):
+            # Not a name (e.g., a path, or a LaTeX or emoji completion
+            # which is not a prefix match).
+            return
+        key = (jl_code[:start], jl_code[jl_pos:])
+        self.cache[key] = dict(
+            partial=partial,
+            texts=texts,
+            state=state,
+            query_time=query_time,
+            queried=time.monotonic(),
+        )
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
     def julia_completions(self, full_text, offset):
         self.last_text = full_text
         match = self.magic_re.match(full_text)
@@ -36,10 +121,25 @@ class JuliaCompleter(object):
         prefix_len = match.end()
         jl_pos = offset - prefix_len
         jl_code = full_text[prefix_len:]
-        texts, (jl_start, jl_end), should_complete = self.jlcomplete(jl_code, jl_pos)
-        start = jl_start - 1 + prefix_len
-        end = jl_end + prefix_len
-        completions = [Completion(start, end, txt) for txt in texts]
+
+        state = tuple(self.jlstate())
+        cached = self.cached_completions(jl_code, jl_pos, state)
+        if cached is not None:
+            texts, start = cached
+            end = jl_pos
+        else:
+            t0 = time.perf_counter()
+            texts, (jl_start, jl_end), should_complete = self.jlcomplete(
+                jl_code, jl_pos
+            )
+            query_time = time.perf_counter() - t0
+            start = jl_start - 1
+            end = jl_end
+            if end == jl_pos:
+                self.store(jl_code, jl_pos, list(texts), start, state, query_time)
+        completions = [
+            Completion(start + prefix_len, end + prefix_len, txt) for txt in texts
+        ]
         self.last_completions = completions
         # if not should_complete:
         #     return []
@@ -1,9 +1,34 @@
 from __future__ import absolute_import, print_function
 
+import os
+import time
 import warnings
+from logging import getLogger  # see `julia.core.logger`
+
+logger = getLogger("julia.ipy.revise")
 
 revise_errors_limit = 1
 
+# Wall time of the last run of the hook, for each step:
+last_hook_stats = {}
+
+# `jl_eval_string` evaluates only one expression; hence `let ... end`.
+LIST_FILES = """
+let R = Revise
+    () -> String[joinpath(dir, file)
+                 for (dir, wl) in R.watched_files
+                 for file in keys(wl.trackedfiles)]
+end
+"""
+
+# Changes when Revise starts tracking new files (e.g., after `using`):
+TRACKING_STATE = """
+let R = Revise
+    () -> (length(Base.loaded_modules), length(R.watched_files),
+           length(R.included_files))
+end
+"""
+
 
 def enable_revise():
     """
@@ -23,15 +48,100 @@ def disable_revise():
     revise_errors = revise_errors_limit
 
 
-def make_revise_wrapper(revise):
+def file_stamp(path):
+    """
+    Modification time and size of `path` (`None` if it does not exist).
+
+    The size catches changes within the mtime resolution of the file
+    system.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class WatchedFiles(object):
+    """
+    Detect changes in the files tracked by Revise.jl by polling their
+    mtime and size.
+
+    `list_files` and `tracking_state` are Julia functions (see
+    `LIST_FILES` and `TRACKING_STATE`).  The files are listed again
+    only when the tracking state changes.  If they fail (e.g., Revise's
+    internals changed), every cell is treated as changed.
+    """
+
+    def __init__(self, list_files, tracking_state):
+        self.list_files = list_files
+        self.tracking_state = tracking_state
+        self.state = None
+        self.stamps = {}
+        self.broken = False
+
+    def snapshot(self):
+        """
+        Record the files tracked by Revise and their current stamp.
+        """
+        if self.broken:
+            return
+        try:
+            self.state = tuple(self.tracking_state())
+            self.stamps = {path: file_stamp(path) for path in self.list_files()}
+        except Exception as err:
+            self.mark_broken(err)
+
+    def changed(self):
+        if self.broken or self.state is None:
+            return True
+        try:
+            if tuple(self.tracking_state()) != self.state:
+                return True
+        except Exception as err:
+            self.mark_broken(err)
+            return True
+        return any(file_stamp(path) != t for path, t in self.stamps.items())
+
+    def mark_broken(self, err):
+        self.broken = True
+        warnings.warn(
+            "Cannot list files tracked by Revise.jl ({})."
+            "  Running Revise before every cell.".format(err)
+        )
+
+
+def make_revise_wrapper(revise, watched=None):
+    """
+    Make a ``pre_execute`` hook calling `revise`.
+
+    If `watched` (a `WatchedFiles`) is given, `revise` is called only
+    when a tracked file is changed.
+    """
+
     def revise_wrapper():
         global revise_errors
 
         if revise_errors >= revise_errors_limit:
             return
 
+        t0 = time.perf_counter()
         try:
+            if watched is not None and not watched.changed():
+                record_hook_stats(check_time=time.perf_counter() - t0)
+                return
+            t1 = time.perf_counter()
+            # Snapshot first so that files saved while `revise` runs are
+            # detected by the next check:
+            if watched is not None:
+                watched.snapshot()
+            t2 = time.perf_counter()
             revise()
+            record_hook_stats(
+                check_time=t1 - t0,
+                revise_time=time.perf_counter() - t2,
+                snapshot_time=t2 - t1,
+            )
         except Exception as err:
             warnings.warn(str(err))
             revise_errors += 1
@@ -46,6 +156,19 @@ def make_revise_wrapper(revise):
     return revise_wrapper
 
 
+def record_hook_stats(check_time, revise_time=None, snapshot_time=None):
+    last_hook_stats.clear()
+    last_hook_stats.update(
+        check_time=check_time, revise_time=revise_time, snapshot_time=snapshot_time
+    )
+    logger.debug(
+        "Revise hook: check %.3f s, revise %s, snapshot %s",
+        check_time,
+        "skipped" if revise_time is None else "%.3f s" % revise_time,
+        "-" if snapshot_time is None else "%.3f s" % snapshot_time,
+    )
+
+
 def register_revise_hook(ip):
     global revise_errors
 
@@ -58,5 +181,16 @@ def register_revise_hook(ip):
         )
         return
 
+    from julia import Main
+
+    try:
+        watched = WatchedFiles(Main.eval(LIST_FILES), Main.eval(TRACKING_STATE))
+    except Exception as err:
+        warnings.warn(
+            "Cannot watch files tracked by Revise.jl ({})."
+            "  Running Revise before every cell.".format(err)
+        )
+        watched = None
+
     revise_errors = 0
-    ip.events.register("pre_execute", make_revise_wrapper(revise))
+    ip.events.register("pre_execute", make_revise_wrapper(revise, watched))
@@ -21,6 +21,7 @@ from logging import getLogger  # see `.core.logger`
 
 from .api import JuliaInfo, LibJulia
 from .core import enable_debug, which
+from .startup_profile import StartupProfile
 from .tools import julia_py_executable
 
 logger = getLogger("julia")
@@ -37,9 +38,13 @@ def julia_py(julia, pyjulia_debug, jl_args):
         os.path.dirname(os.path.realpath(__file__)), "patch.jl"
     )
 
-    juliainfo = JuliaInfo.load(julia=julia)
-    api = LibJulia.from_juliainfo(juliainfo)
-    api.init_julia(jl_args)
+    profile = StartupProfile()
+    with profile.phase("juliainfo"):
+        juliainfo = JuliaInfo.load(julia=julia)
+    with profile.phase("dlopen"):
+        api = LibJulia.from_juliainfo(juliainfo)
+    with profile.phase("init", lambda: api):
+        api.init_julia(jl_args)
     code = 1
     if juliainfo.version_info >= (1, 5, 0):
         logger.debug("Skipping `__init__()` hacks in `julia` %s", juliainfo.version_raw)
@@ -64,9 +69,14 @@ def julia_py(julia, pyjulia_debug, jl_args):
             print("julia-py: Error while calling `Random.__init__()`", file=sys.stderr)
             sys.exit(code)
     logger.debug("Loading %s", patch_jl_path)
-    if not api.jl_eval_string(b"""Base.include(Main, ENV["_PYJULIA_PATCH_JL"])"""):
+    with profile.phase("patch", lambda: api):
+        patched = api.jl_eval_string(
+            b"""Base.include(Main, ENV["_PYJULIA_PATCH_JL"])"""
+        )
+    if not patched:
         print("julia-py: Error in", patch_jl_path, file=sys.stderr)
         sys.exit(code)
+    logger.debug("Startup profile:\n%s", profile.format())
     logger.debug("Calling `Base._start()`")
     if api.jl_eval_string(b"Base.invokelatest(Base._start)"):
         code = 0
@@ -22,5 +22,9 @@ if modpath !== nothing
         include(PyCall_depsfile)
         println(pyprogramname)
         println(libpython)
+        PyCall_project = joinpath(dirname(modpath),"..","Project.toml")
+        if isfile(PyCall_project)
+            println(Pkg.TOML.parsefile(PyCall_project)["version"])
+        end
     end
 end
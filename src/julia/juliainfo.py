@@ -54,6 +54,8 @@ class JuliaInfo(object):
         Python executable with which PyCall.jl is configured.
     libpython_path : str
         libpython path used by PyCall.jl.
+    pycall_version : str
+        Version of PyCall.jl (`None` if PyCall.jl is not built).
     """
 
     @classmethod
@@ -108,6 +110,7 @@ class JuliaInfo(object):
         sysimage=None,
         python=None,
         libpython_path=None,
+        pycall_version=None,
     ):
         self.julia = julia
         self.bindir = bindir
@@ -125,6 +128,7 @@ class JuliaInfo(object):
 
         self.python = python
         self.libpython_path = libpython_path
+        self.pycall_version = pycall_version
 
         logger.debug("pyprogramname = %s", python)
         logger.debug("sys.executable = %s", sys.executable)
@@ -86,6 +86,14 @@ def setup_libjulia(libjulia):
     libjulia.jl_is_initialized.restype = ctypes.c_int
     libjulia.jl_atexit_hook.argtypes = [ctypes.c_int]
 
+    if hasattr(libjulia, "jl_gc_safe_enter"):
+        for name in ["jl_gc_safe_enter", "jl_gc_unsafe_enter"]:
+            getattr(libjulia, name).argtypes = []
+            getattr(libjulia, name).restype = ctypes.c_int8
+        for name in ["jl_gc_safe_leave", "jl_gc_unsafe_leave"]:
+            getattr(libjulia, name).argtypes = [ctypes.c_int8]
+            getattr(libjulia, name).restype = None
+
 
 try:
     # A hack to make `_LIBJULIA` survive reload:
@@ -113,6 +121,50 @@ class BaseLibJulia(object):
     def __getattr__(self, name):
         return getattr(self.libjulia, name)
 
+    def supports_gc_safe(self):
+        """
+        Check if libjulia exports the functions used by `gc_safe`.
+        """
+        supported = self.__dict__.get("_supports_gc_safe")
+        if supported is None:
+            supported = self._supports_gc_safe = hasattr(
+                self.libjulia, "jl_gc_safe_enter"
+            )
+        return supported
+
+    @contextmanager
+    def gc_safe(self):
+        """
+        Mark this thread as not running Julia code inside the ``with`` block.
+
+        Julia's garbage collector then runs in other threads without
+        waiting for this thread.  Julia must be called inside the block
+        only through `gc_unsafe`.  It does nothing if not supported (see
+        `supports_gc_safe`).
+        """
+        if not self.supports_gc_safe():
+            yield
+            return
+        state = self.libjulia.jl_gc_safe_enter()
+        try:
+            yield
+        finally:
+            self.libjulia.jl_gc_safe_leave(state)
+
+    @contextmanager
+    def gc_unsafe(self):
+        """
+        Allow calling Julia in the ``with`` block even inside `gc_safe`.
+        """
+        if not self.supports_gc_safe():
+            yield
+            return
+        state = self.libjulia.jl_gc_unsafe_enter()
+        try:
+            yield
+        finally:
+            self.libjulia.jl_gc_unsafe_leave(state)
+
 
 class LibJulia(BaseLibJulia):
     """
@@ -19,15 +19,21 @@ Usage
 
 from __future__ import absolute_import, print_function
 
+import asyncio
 import inspect
 import sys
+import time
 import warnings
+from collections import OrderedDict
+from contextlib import ExitStack
 
+from IPython.core.error import UsageError
 from IPython.core.magic import Magics, line_cell_magic, magics_class
-from traitlets import Bool, Enum
+from IPython.core.magic_arguments import argument, magic_arguments, parse_argstring
+from traitlets import Bool, Enum, Float, Int
 
 from .core import Julia, JuliaError
-from .tools import redirect_output_streams
+from .tools import flush_julia_output, redirect_output_streams
 
 try:
     unicode
@@ -46,6 +52,172 @@ except ImportError:
 # Main classes
 # ----------------------------------------------------------------------------
 
+CELL_TEMPLATE = """
+_PyJuliaHelper.@prepare_for_pyjulia_call begin
+    begin %s end
+    %s
+end
+"""
+
+
+def magic_flags(line):
+    """
+    Options in the `line` of ``%%julia``.
+
+    Other text is ignored (as it always has been).
+
+    >>> magic_flags("--time some comment")
+    ['--time']
+    >>> magic_flags("notes --profile tree")
+    ['--profile', 'tree']
+    """
+    tokens = line.split()
+    flags = []
+    for i, token in enumerate(tokens):
+        if token.startswith("--") and len(token) > 2:
+            flags.append(token)
+        elif i > 0 and tokens[i - 1] == "--profile" and token in ("flat", "tree"):
+            flags.append(token)
+    return flags
+
+
+def interpolate(codes, globals, locals):
+    """
+    Evaluate Python `codes` for `$var` interpolation in a `%%julia` cell.
+
+    Return a tuple of the values and a list of flags indicating which
+    values are NumPy arrays (possibly passed to Julia without copying).
+
+    >>> interpolate(["x", "x + 1"], {"x": 1}, {})
+    ((1, 2), [False, False])
+    """
+    ndarray = getattr(sys.modules.get("numpy"), "ndarray", None)
+    values = []
+    isarray = []
+    for code in codes:
+        if "\n" in code:
+            exec(code, globals, locals)
+            value = None
+        else:
+            value = eval(code, globals, locals)
+        values.append(value)
+        isarray.append(ndarray is not None and isinstance(value, ndarray))
+    return tuple(values), isarray
+
+
+def format_cell_stats(stats, show_time=True, show_allocs=True):
+    """
+    Format the statistics of a `%%julia --time`/`--allocs` cell.
+
+    >>> stats = dict(wall_time=1.5, time=1.25, compile_time=1.0,
+    ...              gc_time=0.0, allocations=1234, allocated=3 * 2**20)
+    >>> print(format_cell_stats(stats))
+    Wall time: 1.500 s (Julia: 1.250 s = 1.000 s compile + 0.250 s run, 0.000 s GC)
+    Allocations: 1234 (3.000 MiB)
+    """
+    lines = []
+    if show_time:
+        compile_time = stats["compile_time"]
+        if compile_time is None:
+            breakdown = "{:.3f} s".format(stats["time"])
+        else:
+            breakdown = "{:.3f} s = {:.3f} s compile + {:.3f} s run".format(
+                stats["time"], compile_time, max(stats["time"] - compile_time, 0.0)
+            )
+        lines.append(
+            "Wall time: {:.3f} s (Julia: {}, {:.3f} s GC)".format(
+                stats["wall_time"], breakdown, stats["gc_time"]
+            )
+        )
+    if show_allocs:
+        lines.append(
+            "Allocations: {} ({:.3f} MiB)".format(
+                stats["allocations"], stats["allocated"] / 2.0**20
+            )
+        )
+    return "\n".join(lines)
+
+
+class JuliaDisplay(object):
+    """
+    Result of a cell executed by `%%julia --display`.
+
+    The Julia value is not converted to Python.  It is rendered with
+    Julia's `show` for ``text/plain`` and ``text/html`` (if supported)
+    limited to `rows` and `cols` like the Julia REPL.  Call `value` to
+    convert it to Python.
+    """
+
+    def __init__(self, magics, result, rows=25, cols=80):
+        self._magics = magics
+        self.result = result
+        self.rows = rows
+        self.cols = cols
+
+    def _show(self, mime):
+        return self._magics._helper("show_result")(
+            self.result, mime, self.rows, self.cols
+        )
+
+    def value(self):
+        """
+        Convert the Julia value to Python.
+        """
+        return self._magics._helper("display_value")(self.result)
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(self._show("text/plain"))
+
+    def _repr_html_(self):
+        return self._show("text/html")
+
+
+class BackgroundCell(object):
+    """
+    Handle of a cell executed by `%%julia --background`.
+
+    Call `result` to wait for the cell and get its value, or ``await``
+    the handle in IPython to wait without blocking the event loop.
+    """
+
+    def __init__(self, magics, task):
+        self._magics = magics
+        self.task = task
+
+    def status(self):
+        """
+        Return ``"running"``, ``"done"`` or ``"failed"``.
+        """
+        return self._magics._helper("background_status")(self.task)
+
+    def done(self):
+        return self.status() != "running"
+
+    def result(self):
+        """
+        Wait for the cell and return its value (or raise its error).
+        """
+        return self._magics._helper("background_fetch")(self.task)
+
+    async def wait(self, interval=0.1):
+        """
+        Poll the cell every `interval` seconds and return its value.
+        """
+        magics = self._magics
+        while not self.done():
+            magics._flush_output()
+            # Let Julia's GC run while this thread waits:
+            with magics._julia.api.gc_safe():
+                await asyncio.sleep(interval)
+        magics._flush_output()
+        return self.result()
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, self.status())
+
 
 @magics_class
 class JuliaMagics(Magics):
@@ -76,6 +248,38 @@ class JuliaMagics(Magics):
         "auto" (default) means to do so only in Jupyter.
         """,
     )
+    output_flush_bytes = Int(
+        4096,
+        config=True,
+        help="""
+        Forward redirected output of Julia to Python in batches of this
+        many bytes.
+        """,
+    )
+    output_flush_interval = Float(
+        0.05,
+        config=True,
+        help="""
+        Forward redirected output of Julia to Python at least this
+        often (in seconds) while Julia is running.
+        """,
+    )
+    cell_cache_size = Int(
+        128,
+        config=True,
+        help="""
+        Maximum number of compiled `%julia` and `%%julia` cells to be
+        cached.  Re-running a cached cell only interpolates `$var` and
+        calls the compiled cell.  Set it to 0 to disable the cache.
+        """,
+    )
+    display_results = Bool(
+        False,
+        config=True,
+        help="""
+        Run `%%julia` cells with `--display` by default.
+        """,
+    )
     revise = Bool(
         False,
         config=True,
@@ -98,16 +302,195 @@ class JuliaMagics(Magics):
         # Flush, otherwise the Julia startup will keep stdout buffered
         sys.stdout.flush()
         self._julia = Julia(init_julia=True)
+        self._cell_cache = OrderedDict()
+        self._background = []
+        self._idle = None  # see `_enter_idle`
+        self._flush_handle = None
+        self._output_redirected = False
         print()
 
+    def _compile_cell(self, src):
+        """
+        Return a list of Python code to be interpolated into `src` (one
+        for each distinct `$var` and each `py"..."`) and a Python callable
+        taking their values (see `interpolate`) and evaluating `src` in
+        Julia.
+
+        Compiled cells are cached (up to `cell_cache_size`) by `src`.
+        """
+        return_value = "nothing" if src.strip().endswith(";") else ""
+        code = CELL_TEMPLATE % (src, return_value)
+
+        cache = self._cell_cache
+        try:
+            compiled = cache.pop(code)
+        except KeyError:
+            compiled = self._julia.eval(code)
+        if self.cell_cache_size > 0:
+            cache[code] = compiled  # (re-)insert as the most recently used
+            while len(cache) > self.cell_cache_size:
+                cache.popitem(last=False)
+        return compiled
+
+    def _helper(self, name):
+        return self._julia.eval("_PyJuliaHelper." + name)
+
+    def _start_background(self, compiled, values, isarray):
+        if not self._helper("background_threads")():
+            # The main thread runs Python most of the time; a task on it
+            # would block the kernel as soon as Julia yields to it.
+            raise UsageError(
+                "--background requires Julia started with multiple threads"
+                " (e.g., set JULIA_NUM_THREADS=auto before loading"
+                " the extension)."
+            )
+        if not self._background:
+            self.shell.events.register("pre_execute", self._leave_idle)
+            self.shell.events.register("post_execute", self._poll_background)
+        handle = BackgroundCell(self, compiled(values, isarray, "background"))
+        self._background.append(handle)
+        return handle
+
+    def _flush_output(self):
+        if self._output_redirected:
+            flush_julia_output()
+
+    def _poll_background(self):
+        """
+        Flush the output of the background cells after each IPython cell
+        and let them run while the kernel is idle.
+        """
+        self._flush_output()
+        self._background = [h for h in self._background if not h.done()]
+        if self._background:
+            self._enter_idle()
+        else:
+            self.shell.events.unregister("pre_execute", self._leave_idle)
+            self.shell.events.unregister("post_execute", self._poll_background)
+
+    def _enter_idle(self):
+        """
+        Mark the main thread as not running Julia code until the next cell.
+
+        Otherwise, garbage collection in the background cells would wait
+        for the main thread, i.e., until Julia is called again.  The
+        output of the background cells is forwarded every
+        `output_flush_interval` seconds by the event loop of the kernel
+        (if any).
+        """
+        if self._idle is not None:
+            return
+        self._idle = ExitStack()
+        self._idle.enter_context(self._julia.api.gc_safe())
+        self._schedule_flush()
+
+    def _leave_idle(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._idle is not None:
+            self._idle.close()
+            self._idle = None
+
+    def _schedule_flush(self):
+        if not self._output_redirected:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(
+            self.output_flush_interval, self._flush_background
+        )
+
+    def _flush_background(self):
+        self._flush_handle = None
+        with self._julia.api.gc_unsafe():
+            self._flush_output()
+            self._background = [h for h in self._background if not h.done()]
+        if self._background:
+            self._schedule_flush()
+        else:
+            self._leave_idle()
+
     @no_var_expand
+    @magic_arguments()
+    @argument(
+        "--background",
+        action="store_true",
+        help="""
+        Run the cell in a Julia task and return a handle to it
+        immediately (see `BackgroundCell`).
+        """,
+    )
+    @argument(
+        "--display",
+        action="store_true",
+        help="""
+        Do not convert the result to Python.  Only display it using
+        Julia's `show` (see `JuliaDisplay`).
+        """,
+    )
+    @argument(
+        "--time",
+        action="store_true",
+        help="""
+        Print wall time of the cell and the time Julia spent for
+        compiling and running it.
+        """,
+    )
+    @argument(
+        "--allocs",
+        action="store_true",
+        help="Print the number and the size of the allocations in Julia.",
+    )
+    @argument(
+        "--profile",
+        nargs="?",
+        const="flat",
+        choices=["flat", "tree"],
+        help="""
+        Profile the cell with Julia's `Profile` and print the result
+        in the given format (default: flat).
+        """,
+    )
     @line_cell_magic
     def julia(self, line, cell=None):
         """
         Execute code in Julia, and pull some of the results back into the
         Python namespace.
+
+        The options are only supported by the cell magic (`%%julia`).
+        Other text on the `%%julia` line is ignored.
+
+        A cell run with `--background` proceeds in a Julia thread other
+        than the main thread while the kernel runs other cells or is
+        idle, and its output is forwarded while the kernel is idle.  It
+        requires Julia started with multiple threads (e.g., with
+        `JULIA_NUM_THREADS`).  Background cells must not call Python.
+
+        With `--display` (or `JuliaMagics.display_results`), large
+        results are shown truncated by Julia without copying them into
+        Python.
+
+        Python variables can be interpolated with `$var` and Python
+        expressions with `py"..."`.  They are evaluated before the cell
+        runs: each distinct variable once and each `py"..."` as many
+        times as it appears, in order.  Contiguous NumPy arrays are
+        passed without copying.
         """
         src = unicode(line if cell is None else cell)
+        args = parse_argstring(
+            self.julia, "" if cell is None else " ".join(magic_flags(line or ""))
+        )
+        if args.background and (
+            args.display or args.time or args.allocs or args.profile
+        ):
+            raise UsageError(
+                "--background cannot be used with"
+                " --display, --time, --allocs or --profile"
+            )
+        display = cell is not None and (args.display or self.display_results)
 
         caller_frame = inspect.currentframe()
         if caller_frame is None:
@@ -125,17 +508,32 @@ class JuliaMagics(Magics):
         ):
             caller_frame = caller_frame.f_back
 
-        return_value = "nothing" if src.strip().endswith(";") else ""
-
-        return self._julia.eval(
-            """
-            _PyJuliaHelper.@prepare_for_pyjulia_call begin
-                begin %s end
-                %s
-            end
-            """
-            % (src, return_value)
-        )(self.shell.user_ns, caller_frame.f_locals)
+        codes, compiled = self._compile_cell(src)
+        values, isarray = interpolate(codes, self.shell.user_ns, caller_frame.f_locals)
+        if args.background:
+            return self._start_background(compiled, values, isarray)
+
+        measure = args.time or args.allocs
+        if measure:
+            self._helper("start_cell_stats")()
+        if args.profile:
+            self._helper("start_profile")()
+        t0 = time.perf_counter()
+        try:
+            if display:
+                result = compiled(values, isarray, "display")
+                return None if result is None else JuliaDisplay(self, result)
+            return compiled(values, isarray, "value")
+        finally:
+            wall_time = time.perf_counter() - t0
+            if self._output_redirected:
+                flush_julia_output()
+            if args.profile:
+                print(self._helper("stop_profile")(args.profile))
+            if measure:
+                stats = self._helper("stop_cell_stats")()
+                stats["wall_time"] = wall_time
+                print(format_cell_stats(stats, args.time, args.allocs))
 
 
 # Add to the global docstring the class information.
@@ -186,7 +584,10 @@ def load_ipython_extension(ip):
     if magics.redirect_output_streams is True or (
         magics.redirect_output_streams == "auto" and should_redirect_output_streams()
     ):
-        redirect_output_streams()
+        magics._output_redirected = redirect_output_streams(
+            flush_bytes=magics.output_flush_bytes,
+            flush_interval=magics.output_flush_interval,
+        )
 
     if magics.revise:
         from .ipy.revise import register_revise_hook
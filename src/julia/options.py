@@ -145,6 +145,13 @@ min_optlevel: {0, 1, 2, 3}
 
 threads: {int, 'auto'}
     How many threads to use.
+
+trace_compile: str
+    Print precompile statements for methods compiled during execution
+    to the given file.  If this option is not given and the environment
+    variable ``PYJULIA_TRACE_COMPILE`` is set to a directory, the
+    statements are written to a file in that directory.  They can be
+    passed to ``python3 -m julia.sysimage --trace``.
 """
 
 
@@ -174,6 +181,7 @@ class JuliaOptions(object):
     inline = Choices("inline", yes_no_etc())
     check_bounds = Choices("check_bounds", yes_no_etc())
     threads = IntEtc("threads", etc={"auto"})
+    trace_compile = String("trace_compile")
 
     def __init__(self, **kwargs):
         unsupported = []
@@ -1 +1,14 @@
+# Default precompile script for `julia.sysimage`.
+#
+# PackageCompiler runs this script in `julia-py` so that PyJulia can be
+# driven from Python.  See `julia/precompile_workload.py` for the code
+# paths exercised by the workload.
+
 using PyCall
+
+try
+    pyimport("julia.precompile_workload").run()
+catch err
+    # Do not fail the build; the system image is still useful without it.
+    @warn "Failed to run PyJulia precompile workload" exception = (err, catch_backtrace())
+end
@@ -0,0 +1,141 @@
+"""
+Workload exercising PyJulia's bridge for the default system image.
+
+`julia.sysimage` compiles the system image with ``precompile.jl`` which
+calls `run` in ``julia-py`` (i.e., a Python process embedding Julia).
+PackageCompiler records the methods compiled while running it and
+stores them in the system image so that the first calls of typical
+operations are fast.
+
+Note that the methods defined in ``Main._PyJuliaHelper`` cannot be
+stored in the system image since this module is ``include``-ed at run
+time.  Only the methods of PyCall, Base, etc. called by it are.
+"""
+
+from __future__ import absolute_import, print_function
+
+# Julia values converted to Python (i.e., `convert(PyObject, ...)`).
+JULIA_VALUES = [
+    "nothing",
+    "true",
+    "1",
+    "Int32(1)",
+    "1.0",
+    "1.0f0",
+    "1 + 2im",
+    '"string"',
+    "'c'",
+    ":symbol",
+    "1:3",
+    "[1, 2, 3]",
+    "[1.0, 2.0, 3.0]",
+    "[1.0 2.0; 3.0 4.0]",
+    "[true, false]",
+    '["a", "b"]',
+    'Any[1, "a", nothing]',
+    '(1, 2.0, "three")',
+    "(a = 1, b = 2.0)",
+    'Dict("a" => 1, "b" => 2)',
+    "Dict{Any,Any}(:a => [1.0])",
+    "Set([1, 2])",
+    "sin",
+    "Base",
+]
+
+# Python values converted to Julia (i.e., `PyAny` conversion).
+PYTHON_VALUES = [
+    None,
+    True,
+    1,
+    1.0,
+    1 + 2j,
+    "string",
+    b"bytes",
+    [1, 2, 3],
+    [1.0, 2.0],
+    ["a", "b"],
+    [1, "a", None],
+    (1, 2.0, "three"),
+    {"a": 1, "b": 2},
+    {"a": [1.0]},
+    {1, 2},
+]
+
+MAGIC_CELL = """
+_PyJuliaHelper.@prepare_for_pyjulia_call begin
+    begin x = $x; y = py"x + 1"; [x, y] end
+
+end
+"""
+"""
+Cell code as generated by `julia.magic.JuliaMagics.julia` for
+``%julia x = $x; y = py"x + 1"; [x, y]``.
+"""
+
+
+def run_numpy(Main):
+    try:
+        import numpy
+    except ImportError:
+        return
+    for dtype in ["float64", "float32", "int64", "int32", "bool", "complex128"]:
+        Main.identity(numpy.zeros(3, dtype=dtype))
+        Main.identity(numpy.zeros((2, 2), dtype=dtype))
+    Main.sum(numpy.arange(3.0))
+    Main.eval("zeros(2, 2)")
+    Main.eval("zeros(Float32, 3)")
+    Main.eval("collect(1:3)")
+
+
+def run_callbacks(Main):
+    # Python functions called from Julia (`pyfunction`/`PyObject` calls)
+    Main.map(lambda x: x + 1, [1, 2, 3])
+    Main.eval("f -> f(1)")(lambda x: x)
+    Main.eval('f -> f(1.0, "a"; k = [1])')(lambda x, y, k: (x, y, k))
+    Main.eval("(f, xs) -> sum(f, xs)")(abs, [-1.0, 2.0])
+
+
+def run_helper(julia, Main):
+    from julia import Base
+    from julia.Main._PyJuliaHelper import completions
+
+    julia.isdefined("Base.sin")
+    julia.isamodule("Base")
+    julia.isafunction("Base.sin")
+    julia.fullname(Base.Enums)
+    Base.sind(90.0)
+    # `JuliaMainModule.__setattr__` and `__getattr__`:
+    Main.pyjulia_precompile_value = [1.0]
+    Main.pyjulia_precompile_value
+    completions("Base.si", 7)
+
+
+def run_magic(julia):
+    # See `julia.magic.interpolate` (not imported since it requires IPython)
+    codes, compiled = julia.eval(MAGIC_CELL)
+    user_ns = {"x": 1}
+    compiled(tuple(eval(c, user_ns) for c in codes), [False] * len(codes), "value")
+    try:
+        import numpy
+    except ImportError:
+        return
+    user_ns = {"x": numpy.zeros(3)}
+    compiled(tuple(eval(c, user_ns) for c in codes), [True, False], "value")
+
+
+def run():
+    """
+    Run the workload.  It is called from ``precompile.jl``.
+    """
+    from julia import Main
+    from julia.core import Julia
+
+    julia = Julia()
+    for src in JULIA_VALUES:
+        Main.eval(src)
+    for value in PYTHON_VALUES:
+        Main.identity(value)
+    run_numpy(Main)
+    run_callbacks(Main)
+    run_helper(julia, Main)
+    run_magic(julia)
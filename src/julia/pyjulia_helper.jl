@@ -1,18 +1,32 @@
 module _PyJuliaHelper
 
-const REPL =
-    Base.require(Base.PkgId(Base.UUID("3fa0cd96-eef1-5676-8a61-b3b8758bbffb"), "REPL"))
 const PyCall =
     Base.require(Base.PkgId(Base.UUID("438e738f-606a-5dbb-bf0a-cddfbfd45ab0"), "PyCall"))
+
 const MacroTools = Base.require(Base.PkgId(
     Base.UUID("1914dd2f-81c6-5fcd-8719-6d5c9610ff09"),
     "MacroTools",
 ))
 
+# REPL is only used by the IPython code completion.  It is loaded on
+# first use so that non-interactive processes do not pay for it at
+# startup.
+const REPL_PKGID = Base.PkgId(Base.UUID("3fa0cd96-eef1-5676-8a61-b3b8758bbffb"), "REPL")
+const PROFILE_PKGID = Base.PkgId(Base.UUID("9abbd945-dff8-562f-b5e8-e1ebf5ef1b79"), "Profile")
+
 using .PyCall
 using .PyCall: Py_eval_input, Py_file_input, pyeval_
 using .MacroTools: isexpr, walk
 
+"""
+    lazy_require(pkgid) -> Module
+
+Load the package `pkgid` if it is not loaded yet and return it.  Since
+the module may be loaded in a newer world age than the caller, functions
+in it have to be called via `Base.invokelatest`.
+"""
+lazy_require(pkgid::Base.PkgId) = get(() -> Base.require(pkgid), Base.loaded_modules, pkgid)
+
 """
     fullnamestr(m)
 
@@ -26,7 +40,9 @@ fullnamestr(m) = join(fullname(m), ".")
 
 isdefinedstr(parent, member) = isdefined(parent, Symbol(member))
 
-function completions(str, pos)
+completions(str, pos) = Base.invokelatest(_completions, lazy_require(REPL_PKGID), str, pos)
+
+function _completions(REPL::Module, str, pos)
     ret, ran, should_complete = REPL.completions(str, Int(pos))
     return (
         map(REPL.completion_text, ret),
@@ -35,13 +51,91 @@ function completions(str, pos)
     )
 end
 
+# Cached completions are invalidated when this changes.  The world age
+# does not change when global variables are created; hence the number
+# of names in `Main`.
+completion_state() =
+    (Int(Base.get_world_counter()), length(names(Main; all = true, imported = true)))
+
+
+"""
+    InterpSlot(index)
+
+Placeholder for the `index`-th value interpolated by
+`@prepare_for_pyjulia_call`.
+"""
+struct InterpSlot
+    index::Int
+end
+
+substitute_slots(x, values) = x
+substitute_slots(x::InterpSlot, values) = values[x.index]
+substitute_slots(ex::Expr, values) =
+    Expr(ex.head, (substitute_slots(a, values) for a in ex.args)...)
+
+"""
+    interp_value(obj::PyObject, as_pyobject::Bool, isarray::Bool)
+
+Convert the interpolated Python object.  Writable Fortran-ordered (or
+one-dimensional) NumPy arrays (`isarray`) are shared with Python
+without copying (see `array_view`).  Other arrays are copied into an
+`Array` by PyCall as usual.
+"""
+function interp_value(obj::PyObject, as_pyobject::Bool, isarray::Bool)
+    as_pyobject && return obj
+    if isarray
+        try
+            view = array_view(PyArray(obj))
+            view === nothing || return view
+        catch
+            # unsupported dtype etc.; fallback to copying
+        end
+    end
+    return convert(PyAny, obj)
+end
+
+"""
+    array_view(a::PyArray) -> Union{Array,Nothing}
+
+Wrap the memory of NumPy array `a` as an `Array` that keeps the Python
+object alive.  Return `nothing` if `a` is read-only (Julia must not
+write into it) or not in Fortran order (it would not be an `Array`).
+"""
+function array_view(a::PyArray)
+    (a.info.readonly || !a.f_contig) && return nothing
+    return keep_alive(unsafe_wrap(Array, a.data, size(a)), a.o)
+end
+
+keep_alive(arr, obj) = finalizer(_ -> obj, arr)
 
-# takes an expression like `$foo + 1` and turns it into a pyfunction
-# `(globals,locals) -> convert(PyAny, pyeval_("foo",globals,locals,PyAny)) + 1`
-# so that Python code can call it and just pass the appropriate globals/locals
-# dicts to perform the interpolation. 
+function run_cell(
+    template,
+    as_pyobject::Vector{Bool},
+    values::PyObject,
+    isarray::Vector{Bool},
+    mode::AbstractString,
+)
+    interpolated = Any[
+        interp_value(get(values, PyObject, i - 1), as_pyobject[i], isarray[i])
+        for i in eachindex(as_pyobject)
+    ]
+    ex = substitute_slots(template, interpolated)
+    mode == "background" && return spawn_cell(ex)
+    ans = Base.eval(Main, ex)
+    mode == "display" && return ans === nothing ? nothing : DisplayResult(ans)
+    return ans
+end
+
+# takes an expression like `$foo + 1 + $foo` and turns it into a tuple
+# `(["foo"], pyfunction((values, isarray, mode) -> ..., ...))`.
+# The Python code in the first element is evaluated by the caller (once
+# for each distinct `$name` and once for each `py"..."`, in order) and
+# the results are passed to the pyfunction as a tuple `values` in one
+# call.  The pyfunction then evaluates
+# `<values[1]> + 1 + <values[1]>` in `Main`.  `mode` is "value"
+# (return the result), "display" (return it wrapped in `DisplayResult`)
+# or "background" (evaluate it in a `Task` returned by `spawn_cell`).
 macro prepare_for_pyjulia_call(ex)
-    
     # f(x, quote_depth) should return a transformed expression x and whether to
     # recurse into the new expression. quote_depth keeps track of how deep
     # inside of nested quote objects we arepyeval
@@ -55,19 +149,30 @@ macro prepare_for_pyjulia_call(ex)
         end
         walk(fx, (recurse ? (x -> stoppable_walk(f,x,quote_depth)) : identity), identity)
     end
-    
-    function make_pyeval(globals, locals, expr::Union{String,Symbol}, options...)
-        code = string(expr)
-        T = length(options) == 1 && 'o' in options[1] ? PyObject : PyAny
-        input_type = '\n' in code ? Py_file_input : Py_eval_input
-        :($convert($T, $pyeval_($code, $globals, $locals, $input_type)))
+
+    codes = String[]
+    as_pyobject = Bool[]
+    name_slots = Dict{Symbol,InterpSlot}()
+
+    function make_slot(code::String, as_pyobj::Bool)
+        push!(codes, code)
+        push!(as_pyobject, as_pyobj)
+        InterpSlot(length(codes))
     end
-    
-    function insert_pyevals(globals, locals, ex)
+
+    # A variable is looked up once even if it appears many times:
+    name_slot(name::Symbol) = get!(() -> make_slot(string(name), false), name_slots, name)
+
+    # Each `py"..."` is evaluated as many times as it appears (it may
+    # have side effects):
+    py_slot(code::String, options...) =
+        make_slot(code, length(options) == 1 && 'o' in options[1])
+
+    function insert_slots(ex)
         stoppable_walk(ex) do x, quote_depth
             if quote_depth==1 && isexpr(x, :$)
                 if x.args[1] isa Symbol
-                    make_pyeval(globals, locals, x.args[1]), false
+                    name_slot(x.args[1]), false
                 else
                     error("""syntax error in: \$($(string(x.args[1])))
                     Use py"..." instead of \$(...) for interpolating Python expressions.""")
@@ -76,7 +181,7 @@ macro prepare_for_pyjulia_call(ex)
                 if x.args[1]==Symbol("@py_str")
                     # in Julia 0.7+, x.args[2] is a LineNumberNode, so filter it out
                     # in a way that's compatible with Julia 0.6:
-                    make_pyeval(globals, locals, filter(s->(s isa String), x.args[2:end])...), false
+                    py_slot(filter(s->(s isa String), x.args[2:end])...), false
                 else
                     x, false
                 end
@@ -85,18 +190,170 @@ macro prepare_for_pyjulia_call(ex)
             end
         end
     end
-    
+
+    template = insert_slots(ex)
     esc(quote
-        $pyfunction(
-            (globals, locals)->Base.eval(Main, $insert_pyevals(globals, locals, $(QuoteNode(ex)))),
-            $PyObject, $PyObject
+        (
+            $codes,
+            $pyfunction(
+                (values, isarray, mode) -> $run_cell(
+                    $(QuoteNode(template)), $as_pyobject, values, isarray, mode,
+                ),
+                $PyObject, $(Vector{Bool}), $String,
+            ),
         )
     end)
 end
 
 
+# `%%julia --display`:
+
+"""
+    DisplayResult(value)
+
+Result of a cell passed to Python as an opaque reference (i.e., without
+converting `value`).  It is rendered by `show_result`.
+"""
+struct DisplayResult
+    value::Any
+end
+
+display_value(r::DisplayResult) = r.value
+
+"""
+    show_result(r::DisplayResult, mime, rows, cols) -> Union{String,Nothing}
+
+Render `r.value` as `mime` limited to the display size `(rows, cols)`
+like the REPL does.  Return `nothing` if it is not `showable`.
+"""
+function show_result(r::DisplayResult, mime::AbstractString, rows::Integer, cols::Integer)
+    m = MIME(mime)
+    showable(m, r.value) || return nothing
+    io = IOBuffer()
+    show(IOContext(io, :limit => true, :displaysize => (rows, cols)), m, r.value)
+    return String(take!(io))
+end
+
+
+# `%%julia --background`:
+
+"""
+    background_threads() -> Vector{Int}
+
+Threads on which `spawn_cell` runs the cells: all but the main thread
+(which runs Python), preferring the `:default` thread pool (Julia >= 1.9).
+"""
+function background_threads()
+    nthreads = isdefined(Threads, :maxthreadid) ? Threads.maxthreadid() : Threads.nthreads()
+    tids = collect(2:nthreads)
+    if isdefined(Threads, :threadpool) && applicable(Threads.threadpool, 1)
+        default = filter(tid -> Threads.threadpool(tid) === :default, tids)
+        isempty(default) || return default
+    end
+    return tids
+end
+
+const spawned_cells = Threads.Atomic{Int}(0)
+
+"""
+    spawn_cell(ex) -> Task
+
+Evaluate `ex` in `Main` in a new task pinned to one of the
+`background_threads` in turn.  The caller (`julia.magic`) makes sure
+that there is one.
+"""
+function spawn_cell(ex)
+    tids = background_threads()
+    tid = tids[Threads.atomic_add!(spawned_cells, 1) % length(tids) + 1]
+    task = Task(() -> Base.eval(Main, ex))
+    task.sticky = true
+    ccall(:jl_set_task_tid, Cvoid, (Any, Cint), task, tid - 1)
+    schedule(task)
+    return task
+end
+
+background_status(t::Task) =
+    istaskfailed(t) ? "failed" : istaskdone(t) ? "done" : "running"
+
+function background_fetch(t::Task)
+    try
+        return fetch(t)
+    catch err
+        err isa TaskFailedException && throw(err.task.exception)
+        rethrow()
+    end
+end
+
+
+# Statistics for `%%julia --time` and `--allocs`:
+
+function compile_timer_start()
+    if isdefined(Base, :cumulative_compile_timing)
+        Base.cumulative_compile_timing(true)
+        return Base.cumulative_compile_time_ns()[1]
+    elseif isdefined(Base, :cumulative_compile_time_ns_before)
+        return Base.cumulative_compile_time_ns_before()
+    end
+    return nothing
+end
+
+function compile_timer_stop(t0)
+    t0 === nothing && return nothing
+    if isdefined(Base, :cumulative_compile_timing)
+        Base.cumulative_compile_timing(false)
+        return Int(Base.cumulative_compile_time_ns()[1] - t0)
+    else
+        return Int(Base.cumulative_compile_time_ns_after() - t0)
+    end
+end
+
+const cell_stats_start = Ref{Any}()
+
+function start_cell_stats()
+    cell_stats_start[] = (Base.gc_num(), compile_timer_start(), time_ns())
+    return nothing
+end
+
+function stop_cell_stats()
+    t1 = time_ns()
+    gc0, compile0, t0 = cell_stats_start[]
+    diff = Base.GC_Diff(Base.gc_num(), gc0)
+    compile_ns = compile_timer_stop(compile0)
+    return Dict(
+        "time" => (t1 - t0) / 1e9,
+        "compile_time" => compile_ns === nothing ? nothing : compile_ns / 1e9,
+        "gc_time" => diff.total_time / 1e9,
+        "allocations" => Base.gc_alloc_count(diff),
+        "allocated" => diff.allocd,
+    )
+end
+
+# `%%julia --profile`:
+
+function start_profile()
+    Profile = lazy_require(PROFILE_PKGID)
+    Base.invokelatest(Profile.clear)
+    Base.invokelatest(Profile.start_timer)
+    return nothing
+end
+
+function stop_profile(format::AbstractString)
+    Profile = lazy_require(PROFILE_PKGID)
+    Base.invokelatest(Profile.stop_timer)
+    io = IOBuffer()
+    Base.invokelatest(
+        Profile.print,
+        IOContext(io, :displaysize => (1000, 200));
+        format = Symbol(format),
+    )
+    return String(take!(io))
+end
+
+
 module IOPiper
 
+using ..PyCall: pybytes
+
 const orig_stdin  = Ref{IO}()
 const orig_stdout = Ref{IO}()
 const orig_stderr = Ref{IO}()
@@ -108,61 +365,103 @@ function __init__()
 end
 
 """
-    num_utf8_trailing(d::Vector{UInt8})
-
-If `d` ends with an incomplete UTF8-encoded character, return the number of trailing incomplete bytes.
-Otherwise, return `0`.
+    Forwarder(receiver; flush_bytes, max_buffer)
 
-Taken from IJulia.jl.
+Buffer of the output to be passed to the Python callable `receiver` as
+`bytes`.  The output is passed in batches of at least `flush_bytes`
+bytes or when `flush_pending` is called (e.g., by the timer created in
+`pipe_std_outputs`).  At most `max_buffer` bytes are buffered; the
+writers block (via the OS pipe) while `receiver` is busy.
 """
-function num_utf8_trailing(d::Vector{UInt8})
-    i = length(d)
-    # find last non-continuation byte in d:
-    while i >= 1 && ((d[i] & 0xc0) == 0x80)
-        i -= 1
-    end
-    i < 1 && return 0
-    c = d[i]
-    # compute number of expected UTF-8 bytes starting at i:
-    n = c <= 0x7f ? 1 : c < 0xe0 ? 2 : c < 0xf0 ? 3 : 4
-    nend = length(d) + 1 - i # num bytes from i to end
-    return nend == n ? 0 : nend
+mutable struct Forwarder
+    receiver::Any
+    pending::Vector{UInt8}
+    flush_bytes::Int
+    max_buffer::Int
+end
+
+Forwarder(receiver; flush_bytes = 4096, max_buffer = 2^20) =
+    Forwarder(receiver, UInt8[], flush_bytes, max(max_buffer, flush_bytes))
+
+function forward!(f::Forwarder)
+    isempty(f.pending) && return
+    data = f.pending
+    f.pending = UInt8[]
+    # Incomplete UTF-8 sequences are handled by the receiver (see
+    # `julia.tools.make_receiver`).
+    f.receiver(pybytes(data))
+    return
 end
 
-function pipe_stream(sender::IO, receiver, buf::IO = IOBuffer())
+function pipe_stream(sender::IO, f::Forwarder)
     try
         while !eof(sender)
-            nb = bytesavailable(sender)
-            write(buf, read(sender, nb))
-
-            # Taken from IJulia.send_stream:
-            d = take!(buf)
-            n = num_utf8_trailing(d)
-            dextra = d[end-(n-1):end]
-            resize!(d, length(d) - n)
-            s = String(copy(d))
-
-            write(buf, dextra)
-            receiver(s)  # check isvalid(String, s)?
+            nb = min(bytesavailable(sender), f.max_buffer - length(f.pending))
+            append!(f.pending, read(sender, nb))
+            length(f.pending) >= f.flush_bytes && forward!(f)
         end
+        forward!(f)
     catch e
         if !isa(e, InterruptException)
             rethrow()
         end
-        pipe_stream(sender, receiver, buf)
+        pipe_stream(sender, f)
     end
 end
 
 const read_stdout = Ref{Base.PipeEndpoint}()
 const read_stderr = Ref{Base.PipeEndpoint}()
+const forwarders = Forwarder[]
+const flush_timer = Ref{Timer}()
+
+"""
+    flush_pending()
 
-function pipe_std_outputs(out_receiver, err_receiver)
+Read the output written so far and pass it to the receivers.
+"""
+function flush_pending()
+    flush(stdout)
+    flush(stderr)
+    # Let `pipe_stream` read the pipes:
+    yield()
+    yield()
+    foreach(forward!, forwarders)
+end
+
+"""
+    pipe_std_outputs(out_receiver, err_receiver; flush_bytes, flush_interval, max_buffer)
+
+Redirect `stdout` and `stderr` to Python callables.  A receiver can be
+`nothing` to keep the stream as-is.  Buffered output is passed to the
+receivers every `flush_interval` seconds while Julia is running.  See
+`Forwarder` for the other options.
+"""
+function pipe_std_outputs(
+    out_receiver,
+    err_receiver;
+    flush_bytes = 4096,
+    flush_interval = 0.05,
+    max_buffer = 2^20,
+)
     global readout_task
     global readerr_task
-    read_stdout[], = redirect_stdout()
-    readout_task = @async pipe_stream(read_stdout[], out_receiver)
-    read_stderr[], = redirect_stderr()
-    readerr_task = @async pipe_stream(read_stderr[], err_receiver)
+    if out_receiver !== nothing
+        f = Forwarder(out_receiver; flush_bytes = flush_bytes, max_buffer = max_buffer)
+        push!(forwarders, f)
+        read_stdout[], = redirect_stdout()
+        readout_task = @async pipe_stream(read_stdout[], f)
+    end
+    if err_receiver !== nothing
+        f = Forwarder(err_receiver; flush_bytes = flush_bytes, max_buffer = max_buffer)
+        push!(forwarders, f)
+        read_stderr[], = redirect_stderr()
+        readerr_task = @async pipe_stream(read_stderr[], f)
+    end
+    if !isassigned(flush_timer) && !isempty(forwarders)
+        flush_timer[] = Timer(flush_interval; interval = flush_interval) do _
+            foreach(forward!, forwarders)
+        end
+    end
 end
 
 end  # module
@@ -0,0 +1,547 @@
+"""
+Pre-warmed Julia daemon and a thin client for short-lived scripts.
+
+Start a daemon which keeps an initialized Julia runtime (optionally
+with a custom system image) listening on a Unix domain socket::
+
+    $ python3 -m julia.server serve --sysimage sys.so &
+
+Then run Python programs inside the daemon.  The arguments are
+interpreted in the same way as ``python-jl``::
+
+    $ python3 -m julia.server run PATH/TO/YOUR/SCRIPT.py ARG1 ARG2
+    $ python3 -m julia.server run -c "from julia import Main; Main.println(1)"
+
+Julia code can be evaluated directly and its result is printed::
+
+    $ python3 -m julia.server eval "sum(1:10)"
+    55
+
+Output of the program is streamed back to the client and the exit
+status of the client is that of the program.  Stop the daemon with::
+
+    $ python3 -m julia.server stop
+
+.. note::
+
+   Programs run in the daemon process one at a time.  Python modules
+   and Julia globals loaded by a program persist and are visible to
+   the following programs.  Environment variables and standard input
+   of the client are not forwarded (except for ``-`` as the script).
+"""
+
+from __future__ import absolute_import, print_function
+
+import argparse
+import codecs
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import traceback
+from contextlib import closing, contextmanager, redirect_stderr, redirect_stdout
+from logging import getLogger  # see `.core.logger`
+
+from .pseudo_python_cli import ARGUMENT_HELP, make_parser, parse_args_with, python
+
+try:
+    from socketserver import UnixStreamServer
+except ImportError:
+    # Windows; `check_unix_socket_support` fails before it is used.
+    UnixStreamServer = object
+
+logger = getLogger("julia.server")
+
+
+class KnownError(RuntimeError):
+    pass
+
+
+def default_socket_path():
+    """
+    Path to the socket used when ``--socket`` is not given.
+
+    It is taken from the environment variable ``PYJULIA_SERVER_SOCKET``
+    if set.  Otherwise, it is in ``$XDG_RUNTIME_DIR`` or, if not set, in
+    a directory only accessible by the current user in the temporary
+    directory (see `private_directory`).
+    """
+    path = os.environ.get("PYJULIA_SERVER_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = private_directory(
+            os.path.join(tempfile.gettempdir(), "pyjulia-{}".format(os.getuid()))
+        )
+    return os.path.join(runtime_dir, "pyjulia-server.sock")
+
+
+def private_directory(path):
+    """
+    Create directory `path` accessible only by the current user.
+
+    Raise `KnownError` if `path` exists but is not such a directory
+    (e.g., created by another user to intercept the requests).
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise KnownError("{} is not a directory".format(path))
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise KnownError(
+            "{} must be owned by the current user and not accessible by"
+            " the others (mode 0700)".format(path)
+        )
+    return path
+
+
+def check_socket_owner(sock, socket_path):
+    """
+    Make sure that the server at `sock` is run by the current user.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        # Linux: credentials of the server process
+        creds = sock.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+        )
+        _pid, uid, _gid = struct.unpack("3i", creds)
+    else:
+        uid = os.stat(socket_path).st_uid
+    if uid != os.getuid():
+        raise KnownError(
+            "PyJulia server at {} is run by another user (uid={})".format(
+                socket_path, uid
+            )
+        )
+
+
+def remove_socket(path):
+    """
+    Remove `path` if it is a socket.  Raise `KnownError` if it is not.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise KnownError("{} exists and is not a socket".format(path))
+    os.remove(path)
+
+
+def check_unix_socket_support():
+    if not hasattr(socket, "AF_UNIX"):
+        raise KnownError("`julia.server` requires Unix domain socket support.")
+
+
+def send_message(wfile, **message):
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+class StreamForwarder(io.TextIOBase):
+    """
+    Text stream sending everything written to it to the client.
+    """
+
+    def __init__(self, wfile, name):
+        self.wfile = wfile
+        self.name = name
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        if s:
+            send_message(self.wfile, stream=self.name, data=s)
+        return len(s)
+
+
+# ----------------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------------
+
+
+@contextmanager
+def working_directory(path):
+    if not path:
+        yield
+        return
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+@contextmanager
+def preserving_argv():
+    argv = list(sys.argv)
+    try:
+        yield
+    finally:
+        sys.argv[:] = argv
+
+
+def exit_code(err):
+    """
+    Convert `SystemExit` to an exit status like the Python interpreter.
+    """
+    if err.code is None:
+        return 0
+    elif isinstance(err.code, int):
+        return err.code
+    print(err.code, file=sys.stderr)
+    return 1
+
+
+def run_python(module=None, command=None, script=None, args=(), source=None):
+    """
+    Run a Python program in this process and return the exit status.
+    """
+    with preserving_argv():
+        try:
+            if source is not None:
+                sys.argv[:] = ["-"] + list(args)
+                scope = {"__name__": "__main__"}
+                exec(compile(source, "<stdin>", "exec"), scope)
+            else:
+                python(
+                    module=module,
+                    command=command,
+                    script=script,
+                    args=list(args),
+                    interactive=False,
+                )
+        except SystemExit as err:
+            return exit_code(err)
+        except Exception:
+            traceback.print_exc()
+            return 1
+    return 0
+
+
+def eval_julia(julia, code):
+    """
+    Evaluate Julia `code`, print the result and return the exit status.
+    """
+    try:
+        ans = julia.eval(code)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    if ans is not None:
+        print(repr(ans))
+    return 0
+
+
+def stream_receiver(name):
+    decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+
+    # Look up `sys.stdout` etc. at each call so that Julia's output goes
+    # to the client currently being served:
+    def receiver(data):
+        stream = getattr(sys, name)
+        stream.write(decode(data))
+        stream.flush()
+
+    return receiver
+
+
+def flush_julia_output(julia):
+    # Let the tasks in `IOPiper` forward pending output:
+    julia.eval("_PyJuliaHelper.IOPiper.flush_pending()")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line.decode("utf-8"))
+        logger.debug("Request: %r", request)
+
+        server = self.server
+        stdout = StreamForwarder(self.wfile, "stdout")
+        stderr = StreamForwarder(self.wfile, "stderr")
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            with working_directory(request.get("cwd")):
+                op = request.get("op")
+                if op == "python":
+                    code = run_python(**request["args"])
+                elif op == "julia":
+                    code = eval_julia(server.julia, request["code"])
+                elif op == "stop":
+                    server.stop_requested = True
+                    code = 0
+                else:
+                    print("Unknown request: {!r}".format(op), file=sys.stderr)
+                    code = 2
+                if server.julia is not None:
+                    flush_julia_output(server.julia)
+
+        send_message(self.wfile, exit=code)
+
+
+class JuliaServer(UnixStreamServer):
+    """
+    Serve requests sent by `request` one at a time using `julia`.
+    """
+
+    def __init__(self, socket_path, julia):
+        self.julia = julia
+        self.stop_requested = False
+
+        if os.path.exists(socket_path):
+            if is_listening(socket_path):
+                raise KnownError(
+                    "Server is already listening at {}".format(socket_path)
+                )
+            remove_socket(socket_path)
+
+        # Only the owner may connect since the clients can run
+        # arbitrary code:
+        umask = os.umask(0o077)
+        try:
+            UnixStreamServer.__init__(self, socket_path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def serve_until_stopped(self):
+        try:
+            while not self.stop_requested:
+                self.handle_request()
+        finally:
+            self.server_close()
+            remove_socket(self.server_address)
+
+
+def serve(socket_path=None, julia="julia", sysimage=None, debug=False):
+    """
+    Initialize Julia runtime and serve the requests until stopped.
+    """
+    check_unix_socket_support()
+    if socket_path is None:
+        socket_path = default_socket_path()
+
+    from .core import Julia
+
+    julia_options = {}
+    if sysimage:
+        julia_options["sysimage"] = sysimage
+    jl = Julia(runtime=julia, debug=debug, **julia_options)
+
+    server = JuliaServer(socket_path, jl)
+
+    # Julia's stdout and stderr (file descriptors 1 and 2) are forwarded
+    # to the clients.  The daemon's own output must go to the original
+    # streams; otherwise it would be sent to a client or forwarded to
+    # itself forever.
+    detach_std_streams()
+    from .Main._PyJuliaHelper.IOPiper import pipe_std_outputs
+
+    pipe_std_outputs(stream_receiver("stdout"), stream_receiver("stderr"))
+
+    logger.info("Listening at %s", socket_path)
+    print("Listening at", socket_path, file=sys.stderr)
+    sys.stderr.flush()
+    server.serve_until_stopped()
+
+
+def detach_std_streams():
+    """
+    Point `sys.stdout`, `sys.stderr` and the log handlers writing to them
+    to duplicates of file descriptors 1 and 2.
+    """
+    for name in ("stdout", "stderr"):
+        old = getattr(sys, name)
+        old.flush()
+        new = io.TextIOWrapper(
+            os.fdopen(os.dup(old.fileno()), "wb"),
+            encoding=old.encoding,
+            errors=old.errors,
+            line_buffering=True,
+        )
+        setattr(sys, name, new)
+        for lgr in (getLogger(), getLogger("julia"), logger):
+            for handler in lgr.handlers:
+                if getattr(handler, "stream", None) is old:
+                    handler.setStream(new)
+
+
+# ----------------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------------
+
+
+def is_listening(socket_path):
+    try:
+        with closing(socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)) as sock:
+            sock.connect(socket_path)
+    except (OSError, socket.error):
+        return False
+    return True
+
+
+def request(message, socket_path=None, stdout=None, stderr=None):
+    """
+    Send `message` to the server, stream the output and return exit status.
+    """
+    check_unix_socket_support()
+    if socket_path is None:
+        socket_path = default_socket_path()
+    streams = dict(stdout=stdout or sys.stdout, stderr=stderr or sys.stderr)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with closing(sock):
+        try:
+            sock.connect(socket_path)
+        except (OSError, socket.error) as err:
+            raise KnownError(
+                "Cannot connect to PyJulia server at {}: {}\n"
+                "Start it with `python -m julia.server serve`.".format(socket_path, err)
+            )
+        check_socket_owner(sock, socket_path)
+        with closing(sock.makefile("rwb")) as f:
+            send_message(f, **message)
+            for line in f:
+                response = json.loads(line.decode("utf-8"))
+                if "stream" in response:
+                    stream = streams[response["stream"]]
+                    stream.write(response["data"])
+                    stream.flush()
+                elif "exit" in response:
+                    return response["exit"]
+    raise KnownError("Connection to PyJulia server is closed unexpectedly.")
+
+
+def python_request(python_args):
+    """
+    Convert Python command line arguments to a request message.
+    """
+    parser = make_parser(
+        description=__doc__
+        + ARGUMENT_HELP.replace(
+            "  -i             inspect interactively after running script.\n", ""
+        )
+    )
+    ns = parse_args_with(parser, python_args)
+    if ns.interactive:
+        parser.error("-i is not supported by julia.server")
+
+    args = dict(module=ns.module, command=ns.command, args=ns.args)
+    if ns.script == "-":
+        args["source"] = sys.stdin.read()
+    elif ns.script:
+        args["script"] = os.path.abspath(ns.script)
+    elif not (ns.module or ns.command):
+        parser.error("Interactive mode is not supported by julia.server")
+    return dict(op="python", cwd=os.getcwd(), args=args)
+
+
+class CustomFormatter(
+    argparse.RawDescriptionHelpFormatter, argparse.ArgumentDefaultsHelpFormatter
+):
+    pass
+
+
+def make_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m julia.server",
+        formatter_class=CustomFormatter,
+        description=__doc__,
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket_path",
+        help="""
+        Path to the Unix domain socket.  Defaults to environment
+        variable `$PYJULIA_SERVER_SOCKET` or a per-user path in the
+        temporary directory.
+        """,
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    p = subparsers.add_parser(
+        "serve", formatter_class=CustomFormatter, help="Start the daemon."
+    )
+    p.add_argument("--julia", default="julia", help="Julia executable.")
+    p.add_argument("--sysimage", help="Julia system image to be used.")
+    p.add_argument("--debug", action="store_true", help="Print debug log.")
+
+    # Arguments after `run` are parsed by `python_request`:
+    subparsers.add_parser(
+        "run",
+        add_help=False,
+        help="Run a Python program in the daemon (see `run -h`).",
+    )
+
+    p = subparsers.add_parser("eval", help="Evaluate Julia code in the daemon.")
+    p.add_argument("code")
+
+    subparsers.add_parser("stop", help="Stop the daemon.")
+    return parser
+
+
+def split_run_args(args):
+    """
+    Split `args` at the ``run`` command.
+
+    >>> split_run_args(["--socket", "run", "run", "-c", "1"])
+    (['--socket', 'run', 'run'], ['-c', '1'])
+    >>> split_run_args(["eval", "1"])
+    (['eval', '1'], [])
+    """
+    i = 0
+    while i < len(args):
+        if args[i] == "--socket":
+            i += 2
+            continue
+        elif args[i] == "run":
+            return args[: i + 1], args[i + 1 :]
+        elif not args[i].startswith("-"):
+            break
+        i += 1
+    return args, []
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    args, python_args = split_run_args(list(args))
+    parser = make_argument_parser()
+    ns = parser.parse_args(args)
+    try:
+        if ns.command == "serve":
+            serve(
+                socket_path=ns.socket_path,
+                julia=ns.julia,
+                sysimage=ns.sysimage,
+                debug=ns.debug,
+            )
+            return
+        elif ns.command == "run":
+            message = python_request(python_args)
+        elif ns.command == "eval":
+            message = dict(op="julia", cwd=os.getcwd(), code=ns.code)
+        elif ns.command == "stop":
+            message = dict(op="stop")
+        else:
+            parser.error("command is required")
+        sys.exit(request(message, socket_path=ns.socket_path))
+    except KnownError as err:
+        print(err, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Record wall time and allocation of each phase of Julia runtime startup.
+"""
+
+from __future__ import absolute_import, print_function
+
+import json
+import time
+from contextlib import contextmanager
+
+from .utils import is_apple
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+def peak_rss():
+    """
+    Peak resident set size of this process in bytes (or `None` if unknown).
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes in macOS and in kilobytes elsewhere:
+    return maxrss if is_apple else maxrss * 1024
+
+
+def julia_allocated(api):
+    """
+    Total number of bytes allocated by Julia's GC so far.
+
+    Return `None` if `api` is not given or the Julia runtime is not
+    initialized yet.
+    """
+    if api is None or not api.jl_is_initialized():
+        return None
+    ans = api.jl_eval_string(b"Int64(Base.gc_bytes())")
+    if not ans:
+        api.jl_exception_clear()
+        return None
+    return int(api.jl_unbox_int64(ans))
+
+
+class StartupProfile(object):
+    """
+    Wall time and allocation for each phase of `Julia` initialization.
+
+    Examples
+    --------
+    >>> profile = StartupProfile()
+    >>> with profile.phase("juliainfo"):
+    ...     pass
+    >>> [p["name"] for p in profile.as_dict()["phases"]]
+    ['juliainfo']
+
+    Attributes
+    ----------
+    phases : list of dict
+        Each phase is recorded as a `dict` with keys ``"name"``,
+        ``"wall_time"`` (seconds), ``"julia_allocated"`` (bytes
+        allocated by Julia's GC during the phase; `None` if Julia was
+        not initialized before the phase started) and ``"peak_rss"``
+        (growth of the peak resident set size of the process in bytes;
+        `None` if not supported by the platform).
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name, get_api=lambda: None):
+        """
+        Record the phase `name` executed inside the ``with`` block.
+
+        `get_api` is a callable returning `LibJulia` (or `None`).  It is
+        called before and after the phase to measure Julia's allocation.
+        """
+        rss0 = peak_rss()
+        alloc0 = julia_allocated(get_api())
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - t0
+            alloc1 = julia_allocated(get_api())
+            rss1 = peak_rss()
+            self.phases.append(
+                dict(
+                    name=name,
+                    wall_time=wall_time,
+                    julia_allocated=(
+                        None if alloc0 is None or alloc1 is None else alloc1 - alloc0
+                    ),
+                    peak_rss=None if rss0 is None else rss1 - rss0,
+                )
+            )
+
+    @property
+    def total_time(self):
+        return sum(p["wall_time"] for p in self.phases)
+
+    def as_dict(self):
+        """
+        Return the profile as a JSON-compatible `dict`.
+        """
+        return dict(
+            phases=[dict(p) for p in self.phases],
+            total_time=self.total_time,
+        )
+
+    def to_json(self, **kwargs):
+        """
+        Return the profile as a JSON string.  `kwargs` are passed to
+        `json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def format(self):
+        """
+        Format the profile as a human-readable table.
+
+        >>> profile = StartupProfile()
+        >>> profile.phases.append(dict(
+        ...     name="init", wall_time=0.5, julia_allocated=None, peak_rss=None))
+        >>> print(profile.format())
+        phase                    time [s]  alloc [MiB]    rss [MiB]
+        init                        0.500            -            -
+        total                       0.500
+        """
+
+        def mib(nbytes):
+            return "-" if nbytes is None else "{:.1f}".format(nbytes / 2.0**20)
+
+        lines = [
+            "{:<20} {:>12} {:>12} {:>12}".format(
+                "phase", "time [s]", "alloc [MiB]", "rss [MiB]"
+            )
+        ]
+        for p in self.phases:
+            lines.append(
+                "{:<20} {:>12.3f} {:>12} {:>12}".format(
+                    p["name"],
+                    p["wall_time"],
+                    mib(p["julia_allocated"]),
+                    mib(p["peak_rss"]),
+                )
+            )
+        lines.append("{:<20} {:>12.3f}".format("total", self.total_time))
+        return "\n".join(lines)
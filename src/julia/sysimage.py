@@ -5,9 +5,33 @@ Example::
 
     python3 -m julia.sysimage sys.so
 
+To compile the packages of your Julia project into the system image::
+
+    python3 -m julia.sysimage --project PATH/TO/PROJECT sys.so
+    python3 -m julia.sysimage --project PATH/TO/PROJECT --packages A,B sys.so
+
 Generated system image can be passed to ``sysimage`` option of
 `julia.api.Julia`.
 
+To include the methods compiled by an actual workload, first record the
+precompile statements by running the application with the environment
+variable ``PYJULIA_TRACE_COMPILE`` set to a directory and then pass the
+directory to ``--trace``::
+
+    PYJULIA_TRACE_COMPILE=traces python3 app.py
+    python3 -m julia.sysimage --trace traces sys.so
+
+To compare the startup latency with the new and the stock system images
+after building it::
+
+    python3 -m julia.sysimage --benchmark --benchmark-output report.json sys.so
+
+To build system images for multiple Julia executables and CPU targets
+in parallel into directory ``sysimages``::
+
+    python3 -m julia.sysimage --matrix --julia julia-1.6 --julia julia-1.9 \
+        --cpu-target native --cpu-target x86_64 sysimages
+
 .. note::
 
    This script is not tested on Windows.
@@ -16,16 +40,24 @@ Generated system image can be passed to ``sysimage`` option of
 from __future__ import absolute_import, print_function
 
 import argparse
+import glob
+import hashlib
+import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from logging import getLogger  # see `.core.logger`
 
-from .core import enable_debug
+from .core import JuliaInfo, enable_debug
+from .release import __version__
+from .sysimage_benchmark import benchmark_sysimage, format_report
+from .sysimage_registry import file_digest, project_files, register_sysimage
 from .tools import _julia_version, julia_py_executable
+from .utils import cache_dir, is_apple, is_windows
 
 logger = getLogger("julia.sysimage")
 
@@ -34,6 +66,37 @@ class KnownError(RuntimeError):
     pass
 
 
+CPU_TARGETS = {
+    "x86_64": "generic;sandybridge,-xsaveopt,clone_all;haswell,-rdrnd,base(1)",
+}
+"""
+Named multi-versioned CPU targets (same as the official Julia binaries)
+which can be passed as `cpu_target` of `build_sysimage`.
+"""
+
+
+def resolve_cpu_target(cpu_target):
+    """
+    Expand a name in `CPU_TARGETS`.  Return `None` for the native CPU.
+
+    >>> resolve_cpu_target("native") is None
+    True
+    >>> resolve_cpu_target("generic;haswell,clone_all")
+    'generic;haswell,clone_all'
+    """
+    if not cpu_target or cpu_target == "native":
+        return None
+    return CPU_TARGETS.get(cpu_target, cpu_target)
+
+
+PACKAGECOMPILER_VERSION = "1"
+"""
+Version specifier of PackageCompiler installed in the managed compiler
+environments.  Changing it creates new environments (see
+`compiler_env_path`).
+"""
+
+
 def script_path(name):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), name)
 
@@ -44,9 +107,52 @@ def install_packagecompiler_cmd(julia, compiler_env):
         cmd.append("--color=yes")
     cmd.append(script_path("install-packagecompiler.jl"))
     cmd.append(compiler_env)
+    cmd.append(PACKAGECOMPILER_VERSION)
     return cmd
 
 
+def compiler_env_path(juliainfo):
+    """
+    Path to the managed PackageCompiler environment for `juliainfo`.
+    """
+    return cache_dir(
+        "compiler_env",
+        "julia-{}.{}".format(juliainfo.version_major, juliainfo.version_minor),
+        "PackageCompiler-{}".format(PACKAGECOMPILER_VERSION),
+    )
+
+
+def ensure_compiler_env(julia, juliainfo):
+    """
+    Install PackageCompiler in the managed environment unless it is done.
+
+    The environment is installed in a temporary directory and then
+    moved to `compiler_env_path` so that it contains a ``Manifest.toml``
+    only when the installation is completed.
+    """
+    compiler_env = compiler_env_path(juliainfo)
+    if os.path.exists(os.path.join(compiler_env, "Manifest.toml")):
+        logger.debug("Using compiler environment %s", compiler_env)
+        return compiler_env
+
+    parent = os.path.dirname(compiler_env)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix="tmp.", dir=parent)
+    try:
+        # Not using julia-py to install PackageCompiler to reduce
+        # method re-definition warnings:
+        check_call(install_packagecompiler_cmd(julia, tmp), cwd=tmp)
+        try:
+            os.rename(tmp, compiler_env)
+        except OSError:
+            # Installed by another process in the meantime?
+            if not os.path.exists(compiler_env):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return compiler_env
+
+
 def build_sysimage_cmd(julia_py, julia, compile_args):
     cmd = [julia_py, "--julia", julia]
     if _julia_version(julia) >= (1, 5, 0):
@@ -64,6 +170,40 @@ def check_call(cmd, **kwargs):
     subprocess.check_call(cmd, **kwargs)
 
 
+def trace_files(paths):
+    """
+    Expand directories in `paths` to the trace files in them.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for p in sorted(glob.glob(os.path.join(path, "*.jl"))):
+                yield p
+        else:
+            yield path
+
+
+def merge_precompile_statements(paths, output):
+    """
+    Collect precompile statements in `paths` and write them to `output`.
+
+    `paths` are files generated by Julia's ``--trace-compile`` option
+    (or directories containing them).  Duplicated statements are
+    removed.  Return the number of statements written.
+    """
+    seen = set()
+    with open(output, "w") as out:
+        for path in trace_files(paths):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line.startswith("precompile(") or line in seen:
+                        continue
+                    seen.add(line)
+                    out.write(line)
+                    out.write("\n")
+    return len(seen)
+
+
 @contextmanager
 def temporarydirectory(**kwargs):
     path = tempfile.mkdtemp(**kwargs)
@@ -73,6 +213,222 @@ def temporarydirectory(**kwargs):
         shutil.rmtree(path, ignore_errors=True)
 
 
+def sysimage_key_inputs(
+    juliainfo,
+    julia_py,
+    script,
+    statements_file,
+    base_sysimage,
+    compiler_env,
+    project=None,
+    packages=(),
+    cpu_target=None,
+    filter_stdlibs=False,
+):
+    """
+    Return a `dict` of everything the system image to be built depends on.
+
+    Note that the source code of the packages tracked by path in the
+    `project` (e.g., via ``Pkg.develop``) is not included.
+    """
+
+    def maybe_digest(path):
+        return file_digest(path) if path and os.path.exists(path) else ""
+
+    project_toml, manifest_toml = project_files(project) if project else ("", "")
+
+    return dict(
+        pyjulia=__version__,
+        compile_jl=file_digest(script_path("compile.jl")),
+        patch_jl=file_digest(script_path("patch.jl")),
+        julia=juliainfo.version_raw,
+        julia_py=julia_py,
+        base_sysimage=file_digest(base_sysimage or juliainfo.sysimage),
+        script=file_digest(script),
+        precompile_statements=maybe_digest(statements_file),
+        compiler_env=(
+            maybe_digest(os.path.join(compiler_env, "Manifest.toml"))
+            if compiler_env
+            else "PackageCompiler@" + PACKAGECOMPILER_VERSION
+        ),
+        pycall_python=juliainfo.python,
+        pycall_libpython=juliainfo.libpython_path,
+        pycall_version=juliainfo.pycall_version or "",
+        project=os.path.realpath(project) if project else "",
+        project_toml=maybe_digest(project_toml),
+        manifest_toml=maybe_digest(manifest_toml),
+        packages=sorted(packages),
+        cpu_target=cpu_target or "",
+        filter_stdlibs=bool(filter_stdlibs),
+    )
+
+
+STAGE1_INPUTS = (
+    "pyjulia",
+    "compile_jl",
+    "patch_jl",
+    "julia",
+    "julia_py",
+    "base_sysimage",
+    "compiler_env",
+    "cpu_target",
+    "filter_stdlibs",
+)
+"""
+Inputs of `sysimage_key_inputs` on which the first-stage system image
+(without PyCall) depends.  See the notes in compile.jl.
+"""
+
+SLIM_STAGE1_INPUTS = STAGE1_INPUTS + (
+    "project",
+    "project_toml",
+    "manifest_toml",
+    "packages",
+)
+"""
+Inputs of a first-stage system image with `filter_stdlibs`.  The
+standard libraries kept in it depend on the packages to be compiled.
+"""
+
+
+def stage1_key(inputs):
+    """
+    Key of the first-stage system image for `sysimage_key_inputs`.
+
+    >>> inputs = dict.fromkeys(SLIM_STAGE1_INPUTS, "")
+    >>> slim = dict(inputs, filter_stdlibs=True)
+    >>> stage1_key(dict(inputs, packages=["A"])) == stage1_key(inputs)
+    True
+    >>> stage1_key(dict(slim, packages=["A"])) == stage1_key(slim)
+    False
+    """
+    names = SLIM_STAGE1_INPUTS if inputs["filter_stdlibs"] else STAGE1_INPUTS
+    return sysimage_key({k: inputs[k] for k in names})
+
+
+def sysimage_key(inputs):
+    """
+    Content-addressed key of the system image built from `inputs`.
+
+    >>> sysimage_key(dict(julia="1.6.7")) == sysimage_key(dict(julia="1.6.7"))
+    True
+    >>> sysimage_key(dict(julia="1.6.7")) == sysimage_key(dict(julia="1.7.3"))
+    False
+    """
+    data = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def cached_sysimage_path(key, output):
+    return cache_dir("sysimages", key, os.path.basename(output))
+
+
+def install_file(src, dst):
+    """
+    Copy `src` to `dst` atomically.
+    """
+    tmp = "{}.{}.tmp".format(dst, os.getpid())
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class SysimageBuild(object):
+    """
+    Inputs, key and cache location of a system image build.
+    """
+
+    def __init__(
+        self,
+        workdir,
+        output,
+        julia,
+        script,
+        base_sysimage=None,
+        trace=(),
+        compiler_env="",
+        project=None,
+        packages=(),
+        cpu_target=None,
+        filter_stdlibs=False,
+    ):
+        self.statements_file = ""
+        if trace:
+            self.statements_file = os.path.join(workdir, "precompile_statements.jl")
+            n = merge_precompile_statements(trace, self.statements_file)
+            logger.info("Collected %d precompile statements", n)
+
+        self.juliainfo = JuliaInfo.load(julia)
+        self.inputs = sysimage_key_inputs(
+            juliainfo=self.juliainfo,
+            julia_py=julia_py_executable(),
+            script=script,
+            statements_file=self.statements_file,
+            base_sysimage=base_sysimage,
+            compiler_env=compiler_env,
+            project=project,
+            packages=packages,
+            cpu_target=cpu_target,
+            filter_stdlibs=filter_stdlibs,
+        )
+        self.key = sysimage_key(self.inputs)
+        self.cached = cached_sysimage_path(self.key, output)
+        # Not named after `output` so that it is shared by all builds
+        # with the same `stage1_key`:
+        self.stage1_cached = cache_dir(
+            "sysimages",
+            "stage1",
+            stage1_key(self.inputs),
+            "stage1" + sysimage_extension(),
+        )
+        logger.debug("System image key: %s", self.key)
+
+    def is_cached(self):
+        return os.path.exists(self.cached)
+
+    def store(self, sysimage):
+        """
+        Store the built `sysimage` in the cache.
+        """
+        directory = os.path.dirname(self.cached)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "inputs.json"), "w") as f:
+            json.dump(self.inputs, f, indent=2, sort_keys=True)
+        install_file(sysimage, self.cached)
+
+
+def needs_rebuild(
+    output,
+    julia="julia",
+    script=script_path("precompile.jl"),
+    compiler_env="",
+    base_sysimage=None,
+    trace=(),
+    project=None,
+    packages=(),
+    cpu_target=None,
+    filter_stdlibs=False,
+):
+    """
+    Return `True` if `build_sysimage` with these arguments has to compile
+    a new system image (i.e., no cached artifact matches).
+    """
+    with temporarydirectory(prefix="tmp.pyjulia.sysimage.") as path:
+        build = SysimageBuild(
+            path,
+            output,
+            julia,
+            script,
+            base_sysimage=base_sysimage,
+            trace=trace,
+            compiler_env=compiler_env,
+            project=project,
+            packages=packages,
+            cpu_target=cpu_target,
+            filter_stdlibs=filter_stdlibs,
+        )
+        return not build.is_cached()
+
+
 def build_sysimage(
     output,
     julia="julia",
@@ -80,21 +436,87 @@ def build_sysimage(
     debug=False,
     compiler_env="",
     base_sysimage=None,
+    trace=(),
+    force=False,
+    project=None,
+    packages=(),
+    cpu_target=None,
+    filter_stdlibs=False,
+    register=True,
 ):
+    """
+    Build a system image at `output` and return `SysimageBuild`.
+
+    PyCall and `packages` are compiled into the system image.  If a
+    Julia `project` is given, the packages are taken from this project
+    (without modifying it) and all of its direct dependencies are
+    included by default.
+
+    The system image is stored in a cache keyed by the hash of everything
+    it depends on (Julia version, base system image, precompile script
+    and statements, PyCall's Python configuration, etc.).  If a cached
+    system image with the same key exists, it is copied to `output`
+    instead of compiling a new one unless `force` is true (which also
+    re-creates the cached intermediate system image without PyCall).
+
+    `cpu_target` is passed to PackageCompiler (the CPU of this machine
+    by default).  Use a multi-versioned target such as
+    ``CPU_TARGETS["x86_64"]`` to create a system image which runs
+    efficiently on different CPU generations.
+
+    If `filter_stdlibs` is true, the standard libraries which are not
+    dependencies of the compiled packages are excluded from the system
+    image to reduce its size and memory footprint.  Note that loading
+    them may fail when this system image is used.
+
+    If `register` is true, the system image is registered so that
+    `Julia` uses it by default (see `julia.sysimage_registry`).  Only
+    system images for the native CPU including all standard libraries
+    (i.e., without `cpu_target` and `filter_stdlibs`) are registered
+    since the registry does not distinguish them.
+    """
     if debug:
         enable_debug()
 
+    if register and not is_registrable(cpu_target, filter_stdlibs):
+        logger.info(
+            "Not registering the system image built with"
+            " a non-native CPU target or filtered standard libraries."
+        )
+        register = False
+
     if output.endswith(".a"):
         raise KnownError("Output file must not have extension .a")
 
     julia_py = julia_py_executable()
 
     with temporarydirectory(prefix="tmp.pyjulia.sysimage.") as path:
+        build = SysimageBuild(
+            path,
+            output,
+            julia,
+            script,
+            base_sysimage=base_sysimage,
+            trace=trace,
+            compiler_env=compiler_env,
+            project=project,
+            packages=packages,
+            cpu_target=cpu_target,
+            filter_stdlibs=filter_stdlibs,
+        )
+        if build.is_cached() and not force:
+            logger.info("Using cached system image %s", build.cached)
+            install_file(build.cached, output)
+            if register:
+                register_sysimage(build.cached, build.juliainfo, project)
+            return build
+
         if not compiler_env:
-            compiler_env = os.path.join(path, "compiler_env")
-            # Not using julia-py to install PackageCompiler to reduce
-            # method re-definition warnings:
-            check_call(install_packagecompiler_cmd(julia, compiler_env), cwd=path)
+            compiler_env = ensure_compiler_env(julia, build.juliainfo)
+
+        # Build it in the temporary directory first so that a failed
+        # build does not leave a broken file in the cache or at `output`:
+        sysimage = os.path.join(path, os.path.basename(output))
 
         # Arguments to ./compile.jl script:
         compile_args = [
@@ -102,13 +524,143 @@ def build_sysimage(
             # script -- ./precompile.jl by default
             os.path.realpath(script),
             # output -- path to sys.o file
-            os.path.realpath(output),
+            sysimage,
             # optional base system image to build on
             "" if base_sysimage is None else os.path.realpath(base_sysimage),
+            # precompile statements collected from `trace`
+            build.statements_file,
+            # cached system image without PyCall
+            build.stage1_cached,
+            # optional Julia project providing the packages
+            os.path.realpath(project) if project else "",
+            # packages to be compiled in addition to PyCall
+            ",".join(packages),
+            # CPU target (native if empty)
+            cpu_target or "",
+            # drop the standard libraries not used by the packages
+            "yes" if filter_stdlibs else "",
+            # PyCall version to install (the one used by `julia`)
+            build.inputs["pycall_version"],
+            # re-create the cached system image without PyCall
+            "yes" if force else "",
         ]
 
         check_call(build_sysimage_cmd(julia_py, julia, compile_args), cwd=path)
 
+        build.store(sysimage)
+        install_file(sysimage, output)
+        if register:
+            register_sysimage(build.cached, build.juliainfo, project)
+        return build
+
+
+def is_registrable(cpu_target, filter_stdlibs):
+    """
+    Check if a system image can be selected automatically by `Julia`.
+
+    >>> is_registrable(None, False)
+    True
+    >>> is_registrable("skylake-avx512", False)
+    False
+    >>> is_registrable(None, True)
+    False
+    """
+    return not resolve_cpu_target(cpu_target) and not filter_stdlibs
+
+
+def sysimage_extension():
+    if is_windows:
+        return ".dll"
+    elif is_apple:
+        return ".dylib"
+    return ".so"
+
+
+def matrix_sysimage_name(juliainfo, cpu_target):
+    """
+    File name of the system image for `juliainfo` and `cpu_target`.
+
+    >>> from types import SimpleNamespace
+    >>> info = SimpleNamespace(version_raw="1.9.3")
+    >>> matrix_sysimage_name(info, None).startswith("sys-1.9.3-native.")
+    True
+    >>> matrix_sysimage_name(info, "generic").startswith("sys-1.9.3-cpu")
+    True
+    """
+    if cpu_target:
+        tag = "cpu" + hashlib.sha256(cpu_target.encode("utf-8")).hexdigest()[:8]
+    else:
+        tag = "native"
+    return "sys-{}-{}{}".format(juliainfo.version_raw, tag, sysimage_extension())
+
+
+def build_sysimage_matrix(
+    outdir, julias, cpu_targets=(None,), jobs=None, register=True, **kwargs
+):
+    """
+    Build system images for all pairs of `julias` and `cpu_targets`.
+
+    The builds run in parallel processes (at most `jobs` at the same
+    time).  The system images are created in `outdir` together with
+    ``manifest.json`` which records the Julia runtime and the CPU target
+    of each system image.  Other keyword arguments are passed to
+    `build_sysimage`.  Return the content of ``manifest.json``.
+
+    Only the system image for the native CPU target of each Julia is
+    registered for the automatic selection by `Julia` (unless `register`
+    is false; see `is_registrable`).
+    """
+    os.makedirs(outdir, exist_ok=True)
+    targets = []
+    for julia in julias:
+        juliainfo = JuliaInfo.load(julia)
+        for cpu_target in cpu_targets:
+            cpu_target = resolve_cpu_target(cpu_target)
+            name = matrix_sysimage_name(juliainfo, cpu_target)
+            targets.append((juliainfo, cpu_target, name))
+
+    if jobs is None:
+        jobs = min(len(targets), os.cpu_count() or 1)
+
+    # Each build spends most of its time in `julia` subprocesses so
+    # threads are enough for running them in parallel:
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                build_sysimage,
+                os.path.join(outdir, name),
+                julia=juliainfo.julia,
+                cpu_target=cpu_target,
+                register=False,
+                **kwargs
+            )
+            for (juliainfo, cpu_target, name) in targets
+        ]
+        builds = [f.result() for f in futures]
+
+    if register:
+        filter_stdlibs = kwargs.get("filter_stdlibs", False)
+        for (juliainfo, cpu_target, _), build in zip(targets, builds):
+            if is_registrable(cpu_target, filter_stdlibs):
+                register_sysimage(build.cached, build.juliainfo, kwargs.get("project"))
+
+    manifest = dict(
+        sysimages=[
+            dict(
+                path=name,
+                julia=juliainfo.julia,
+                julia_version=juliainfo.version_raw,
+                libjulia_path=juliainfo.libjulia_path,
+                cpu_target=cpu_target or "native",
+                key=build.key,
+            )
+            for (juliainfo, cpu_target, name), build in zip(targets, builds)
+        ]
+    )
+    with open(os.path.join(outdir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
 
 class CustomFormatter(
     argparse.RawDescriptionHelpFormatter, argparse.ArgumentDefaultsHelpFormatter
@@ -120,7 +672,14 @@ def main(args=None):
     parser = argparse.ArgumentParser(
         formatter_class=CustomFormatter, description=__doc__
     )
-    parser.add_argument("--julia", default="julia")
+    parser.add_argument(
+        "--julia",
+        action="append",
+        help="""
+        Julia executable (`julia` if not given).  It can be specified multiple
+        times with `--matrix`.
+        """,
+    )
     parser.add_argument("--debug", action="store_true", help="Print debug log.")
     parser.add_argument(
         "--script",
@@ -132,9 +691,10 @@ def main(args=None):
         default="",
         help="""
         Path to a Julia project with PackageCompiler to be used for
-        system image compilation.  Create a temporary environment with
-        appropriate PackageCompiler by default or when an empty string
-        is given.
+        system image compilation.  By default or when an empty string
+        is given, use an environment with appropriate PackageCompiler
+        managed under the PyJulia cache directory (created on first
+        use for each Julia version).
         """,
     )
     parser.add_argument(
@@ -144,10 +704,207 @@ def main(args=None):
         Julia system image.
         """,
     )
+    parser.add_argument(
+        "--trace",
+        action="append",
+        default=[],
+        help="""
+        Precompile statements generated by Julia's `--trace-compile`
+        option (or a directory containing them; e.g., the directory
+        specified by `PYJULIA_TRACE_COMPILE`).  It can be specified
+        multiple times.
+        """,
+    )
+    parser.add_argument(
+        "--project",
+        help="""
+        Path to a Julia project whose packages are compiled into the
+        system image together with PyCall.  The project itself is not
+        modified.
+        """,
+    )
+    parser.add_argument(
+        "--packages",
+        type=lambda s: [p for p in s.split(",") if p],
+        default=[],
+        help="""
+        Comma-separated names of the packages to be compiled into the
+        system image in addition to PyCall (e.g., `DataFrames,CSV`).
+        Defaults to all direct dependencies of `--project` if given.
+        """,
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="""
+        Compile a new system image even if a cached one built from the
+        same inputs exists.  The cached intermediate system image
+        without PyCall is re-created as well.
+        """,
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="""
+        Only report if a new system image has to be compiled.  Exit with
+        status 0 if a cached system image can be used and 1 otherwise.
+        """,
+    )
+    parser.add_argument(
+        "--cpu-target",
+        action="append",
+        help="""
+        CPU target passed to PackageCompiler (the CPU of this machine
+        if not given).  Multi-versioned targets (e.g.,
+        `generic;haswell,clone_all`) or the names in
+        `julia.sysimage.CPU_TARGETS` (i.e., {}) can be used.  It can be
+        specified multiple times with `--matrix`.
+        """.format(
+            ", ".join(sorted(CPU_TARGETS))
+        ),
+    )
+    parser.add_argument(
+        "--slim",
+        dest="filter_stdlibs",
+        action="store_true",
+        help="""
+        Exclude the standard libraries which are not (direct or
+        indirect) dependencies of PyCall and the compiled packages
+        (`--project`/`--packages`) to reduce the size, load time and
+        memory usage of the system image.  Loading the excluded standard
+        libraries may fail with this system image.
+        """,
+    )
+    parser.add_argument(
+        "--no-register",
+        dest="register",
+        action="store_false",
+        help="""
+        Do not register the system image for the automatic selection by
+        `julia.api.Julia` (see `julia.sysimage_registry`).  System images
+        built with --cpu-target other than native or with --slim are
+        never registered.
+        """,
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="""
+        After building the system image, compare the size, startup
+        latency and memory usage of `julia-py` and `julia.api.Julia`
+        with the new and the stock (or `--benchmark-baseline`) system
+        images and print a report.
+        """,
+    )
+    parser.add_argument(
+        "--benchmark-function",
+        default="rand",
+        help="""
+        Name of the Julia function `f` in `Main` called as `Main.f()`
+        for measuring the time to the first call.
+        """,
+    )
+    parser.add_argument(
+        "--benchmark-repeat",
+        type=int,
+        default=3,
+        help="Number of measurements (the median is reported).",
+    )
+    parser.add_argument(
+        "--benchmark-baseline",
+        help="""
+        System image compared with the new one (e.g., one built without
+        `--slim`).  Defaults to the stock system image of Julia.
+        """,
+    )
+    parser.add_argument(
+        "--benchmark-output",
+        help="Path to a file where the benchmark report is written as JSON.",
+    )
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help="""
+        Build system images for all combinations of `--julia` and
+        `--cpu-target` in parallel.  `output` is then a directory where
+        the system images and `manifest.json` are created.
+        """,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="""
+        Maximum number of system images built at the same time with
+        `--matrix` (the number of images or CPUs if not given).
+        """,
+    )
     parser.add_argument("output", help="Path to new system image file sys.o.")
     ns = parser.parse_args(args)
+
+    julias = ns.julia or ["julia"]
+    cpu_targets = [resolve_cpu_target(t) for t in ns.cpu_target or [None]]
+    if not ns.matrix and (len(julias) > 1 or len(cpu_targets) > 1):
+        parser.error("Multiple --julia or --cpu-target require --matrix")
+    if ns.matrix and (ns.check or ns.benchmark):
+        parser.error("--check and --benchmark cannot be used with --matrix")
+    ns.julia = julias[0]
+    ns.cpu_target = cpu_targets[0]
+
     try:
+        if ns.matrix:
+            if ns.debug:
+                enable_debug()
+            build_sysimage_matrix(
+                ns.output,
+                julias,
+                cpu_targets,
+                jobs=ns.jobs,
+                script=ns.script,
+                compiler_env=ns.compiler_env,
+                base_sysimage=ns.base_sysimage,
+                trace=ns.trace,
+                force=ns.force,
+                project=ns.project,
+                packages=ns.packages,
+                filter_stdlibs=ns.filter_stdlibs,
+                register=ns.register,
+            )
+            return
+        del ns.matrix, ns.jobs
+        if ns.check:
+            if ns.debug:
+                enable_debug()
+            rebuild = needs_rebuild(
+                ns.output,
+                julia=ns.julia,
+                script=ns.script,
+                compiler_env=ns.compiler_env,
+                base_sysimage=ns.base_sysimage,
+                trace=ns.trace,
+                project=ns.project,
+                packages=ns.packages,
+                cpu_target=ns.cpu_target,
+                filter_stdlibs=ns.filter_stdlibs,
+            )
+            print("Rebuild needed" if rebuild else "Up to date")
+            sys.exit(1 if rebuild else 0)
+        benchmark = dict(
+            function=ns.benchmark_function,
+            repeat=ns.benchmark_repeat,
+            baseline=ns.benchmark_baseline,
+        )
+        benchmark_output = ns.benchmark_output
+        run_benchmark = ns.benchmark
+        del ns.check, ns.benchmark, ns.benchmark_function, ns.benchmark_repeat
+        del ns.benchmark_output, ns.benchmark_baseline
         build_sysimage(**vars(ns))
+        if run_benchmark:
+            report = benchmark_sysimage(ns.output, julia=ns.julia, **benchmark)
+            print(format_report(report))
+            if benchmark_output:
+                with open(benchmark_output, "w") as f:
+                    json.dump(report, f, indent=2)
     except (KnownError, subprocess.CalledProcessError) as err:
         print(err, file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,243 @@
+"""
+Compare startup latency and footprint of a custom system image with the
+stock one (or another baseline system image).
+
+Each measurement runs in a fresh process:
+
+* ``julia-py`` loading PyCall (wall time of the whole process), and
+* a Python process creating `Julia` and calling ``Main.<function>()``
+  (time to initialize `Julia`, time to the first call, the time Julia
+  spent compiling during the first call and the peak RSS).
+
+The size of the system image files is reported as well.
+
+Run it after building a system image with::
+
+    python3 -m julia.sysimage --benchmark sys.so
+"""
+
+from __future__ import absolute_import, print_function
+
+import json
+import os
+import subprocess
+import sys
+import time
+from logging import getLogger  # see `.core.logger`
+
+from .tools import julia_py_executable
+from .utils import PYCALL_PKGID
+
+logger = getLogger("julia.sysimage")
+
+MiB = 2.0**20
+
+METRICS = [
+    # (name, label, unit)
+    ("sysimage_size", "sysimage size [MiB]", MiB),
+    ("julia_py_time", "julia-py startup [s]", 1),
+    ("init_time", "Julia() init [s]", 1),
+    ("first_call_time", "first Main call [s]", 1),
+    ("compile_time", "compile time [s]", 1),
+    ("peak_rss", "peak RSS [MiB]", MiB),
+]
+
+# `jl_eval_string` evaluates only one expression; hence `begin ... end`.
+COMPILE_TIMER_START = """
+begin
+    if isdefined(Base, :cumulative_compile_timing)
+        Base.cumulative_compile_timing(true)
+        global _pyjulia_compile_time0 = Base.cumulative_compile_time_ns()[1]
+    elseif isdefined(Base, :cumulative_compile_time_ns_before)
+        global _pyjulia_compile_time0 = Base.cumulative_compile_time_ns_before()
+    end
+    nothing
+end
+"""
+
+COMPILE_TIMER_STOP = """
+begin
+    if isdefined(Base, :cumulative_compile_timing)
+        Base.cumulative_compile_timing(false)
+        Int(Base.cumulative_compile_time_ns()[1] - _pyjulia_compile_time0)
+    elseif isdefined(Base, :cumulative_compile_time_ns_after)
+        Int(Base.cumulative_compile_time_ns_after() - _pyjulia_compile_time0)
+    else
+        nothing
+    end
+end
+"""
+
+SESSION_SCRIPT = """
+import json
+import sys
+import time
+
+from julia.api import Julia
+from julia.startup_profile import peak_rss
+from julia.sysimage_benchmark import COMPILE_TIMER_START, COMPILE_TIMER_STOP
+
+julia, sysimage, function = sys.argv[1:]
+t0 = time.perf_counter()
+jl = Julia(runtime=julia, sysimage=sysimage)
+t1 = time.perf_counter()
+jl.eval(COMPILE_TIMER_START)
+t2 = time.perf_counter()
+from julia import Main
+getattr(Main, function)()
+t3 = time.perf_counter()
+compile_ns = jl.eval(COMPILE_TIMER_STOP)
+print(json.dumps(dict(
+    init_time=t1 - t0,
+    first_call_time=t3 - t2,
+    compile_time=None if compile_ns is None else compile_ns / 1e9,
+    peak_rss=peak_rss(),
+)))
+"""
+
+
+def benchmark_env():
+    env = dict(os.environ)
+    # Always use the `sysimage` passed explicitly:
+    env["PYJULIA_SYSIMAGE_REGISTRY"] = "no"
+    return env
+
+
+def time_julia_py(julia, sysimage):
+    """
+    Wall time of ``julia-py`` loading PyCall with `sysimage`.
+    """
+    cmd = [
+        julia_py_executable(),
+        "--julia",
+        julia,
+        "--sysimage",
+        sysimage,
+        "--startup-file=no",
+        "-e",
+        "Base.require({}); nothing".format(PYCALL_PKGID),
+    ]
+    logger.debug("Run %s", cmd)
+    t0 = time.perf_counter()
+    subprocess.check_call(cmd, env=benchmark_env())
+    return time.perf_counter() - t0
+
+
+def time_session(julia, sysimage, function):
+    """
+    Run `SESSION_SCRIPT` in a new Python process and return its result.
+    """
+    cmd = [sys.executable, "-c", SESSION_SCRIPT, julia, sysimage, function]
+    logger.debug("Run %s", cmd)
+    output = subprocess.check_output(cmd, env=benchmark_env(), universal_newlines=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median(values):
+    """
+    >>> median([3, 1, 2])
+    2
+    >>> median([])
+    """
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return values[len(values) // 2]
+
+
+def measure(julia, sysimage, function="rand", repeat=3):
+    """
+    Return the median of `repeat` measurements of `METRICS` as a `dict`.
+
+    A metric which cannot be measured (e.g., the stock system image is
+    not usable with this Python) is recorded as `None` and the error
+    message is stored in ``"errors"``.
+    """
+    samples = {name: [] for name, _, _ in METRICS if name != "sysimage_size"}
+    errors = []
+    for _ in range(repeat):
+        try:
+            samples["julia_py_time"].append(time_julia_py(julia, sysimage))
+        except subprocess.CalledProcessError as err:
+            errors.append("julia-py: {}".format(err))
+        try:
+            result = time_session(julia, sysimage, function)
+        except subprocess.CalledProcessError as err:
+            errors.append("Julia(): {}".format(err))
+        else:
+            for name in ("init_time", "first_call_time", "compile_time", "peak_rss"):
+                samples[name].append(result[name])
+    report = {name: median(values) for name, values in samples.items()}
+    report["sysimage_size"] = os.path.getsize(sysimage)
+    report["errors"] = sorted(set(errors))
+    return report
+
+
+def benchmark_sysimage(
+    sysimage, julia="julia", function="rand", repeat=3, baseline=None
+):
+    """
+    Measure `sysimage` and `baseline` (the stock system image by default).
+
+    Return a JSON-compatible `dict` with keys ``"baseline"`` and
+    ``"new"`` (see `measure`).
+    """
+    if baseline is None:
+        from .api import JuliaInfo
+
+        baseline = JuliaInfo.load(julia).sysimage
+    baseline = os.path.realpath(baseline)
+    return dict(
+        julia=julia,
+        function=function,
+        repeat=repeat,
+        baseline=dict(sysimage=baseline, **measure(julia, baseline, function, repeat)),
+        new=dict(
+            sysimage=os.path.realpath(sysimage),
+            **measure(julia, sysimage, function, repeat)
+        ),
+    )
+
+
+def format_report(report):
+    """
+    Format the result of `benchmark_sysimage` as a table.
+
+    The last column is the ratio of the baseline to the new value.
+
+    >>> report = dict(
+    ...     baseline=dict(julia_py_time=2.0, init_time=4.0, first_call_time=1.0,
+    ...                   compile_time=0.5, peak_rss=None, sysimage_size=2**28,
+    ...                   errors=[]),
+    ...     new=dict(julia_py_time=0.5, init_time=0.5, first_call_time=0.1,
+    ...              compile_time=None, peak_rss=None, sysimage_size=2**27,
+    ...              errors=[]))
+    >>> print(format_report(report))
+    metric                 baseline        new      ratio
+    sysimage size [MiB]     256.000    128.000      2.00x
+    julia-py startup [s]      2.000      0.500      4.00x
+    Julia() init [s]          4.000      0.500      8.00x
+    first Main call [s]       1.000      0.100     10.00x
+    compile time [s]          0.500          -          -
+    peak RSS [MiB]                -          -          -
+    """
+
+    def fmt(x, unit):
+        return "-" if x is None else "{:.3f}".format(x / unit)
+
+    baseline = report["baseline"]
+    new = report["new"]
+    lines = ["{:<20} {:>10} {:>10} {:>10}".format("metric", "baseline", "new", "ratio")]
+    for name, label, unit in METRICS:
+        a = baseline.get(name)
+        b = new.get(name)
+        ratio = "{:.2f}x".format(a / b) if a is not None and b else "-"
+        lines.append(
+            "{:<20} {:>10} {:>10} {:>10}".format(
+                label, fmt(a, unit), fmt(b, unit), ratio
+            )
+        )
+    for key in ("baseline", "new"):
+        for err in report[key].get("errors", []):
+            lines.append("{} system image: {}".format(key, err))
+    return "\n".join(lines)
@@ -0,0 +1,281 @@
+"""
+Registry of system images for automatic selection by `Julia`.
+
+`julia.sysimage` registers each system image it builds, keyed by the
+Julia version, the libjulia path, the libpython of the Python which
+built it, the version of PyCall and the hash of the Julia project
+compiled into it (or of Julia's default environment if none).  When
+`Julia` is created without the ``sysimage`` option, it looks up the
+system image matching the current process and uses it if it passes a
+cheap validation.  Otherwise, the default system image of Julia is
+used.
+
+The registry is stored in ``registry.json`` in the system image cache
+directory (see `julia.utils.cache_dir`).  Set the environment variable
+``PYJULIA_SYSIMAGE_REGISTRY`` to a path to use another registry file,
+or to ``no`` to disable the automatic selection.
+"""
+
+from __future__ import absolute_import, print_function
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from logging import getLogger  # see `.core.logger`
+
+from .find_libpython import linked_libpython
+from .utils import cache_dir, env_disabled, file_lock
+
+logger = getLogger("julia.sysimage_registry")
+
+REGISTRY_FORMAT = 2
+
+_registry_lock = threading.Lock()
+
+
+def registry_path():
+    """
+    Path to the registry file or `None` if the registry is disabled.
+    """
+    if env_disabled("PYJULIA_SYSIMAGE_REGISTRY"):
+        return None
+    path = os.environ.get("PYJULIA_SYSIMAGE_REGISTRY")
+    return path or cache_dir("sysimages", "registry.json")
+
+
+def file_digest(path):
+    """
+    SHA-256 hex digest of the content of the file at `path`.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def project_files(project):
+    """
+    Return paths to the project file and manifest of the Julia `project`.
+    """
+
+    def first_existing(*names):
+        for name in names:
+            path = os.path.join(project, name)
+            if os.path.exists(path):
+                return path
+        return ""
+
+    return (
+        first_existing("JuliaProject.toml", "Project.toml"),
+        first_existing("JuliaManifest.toml", "Manifest.toml"),
+    )
+
+
+def project_digest(project):
+    """
+    Hash of the project file and manifest of `project` (``""`` if `None`).
+    """
+    if not project:
+        return ""
+    sha = hashlib.sha256()
+    for path in project_files(project):
+        sha.update((file_digest(path) if path else "").encode("ascii"))
+        sha.update(b"\n")
+    return sha.hexdigest()
+
+
+def active_project(environ=os.environ):
+    """
+    Julia project activated by ``JULIA_PROJECT`` (`None` if not set).
+
+    >>> active_project({})
+    >>> active_project({"JULIA_PROJECT": "/PATH/TO/PROJECT"})
+    '/PATH/TO/PROJECT'
+    """
+    project = environ.get("JULIA_PROJECT")
+    if not project:
+        return None
+    if project == "@.":
+        # Search the current and parent directories like Julia does:
+        path = os.getcwd()
+        while True:
+            if project_files(path)[0]:
+                return path
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+    return project
+
+
+def default_project(juliainfo, environ=os.environ):
+    """
+    Julia's default environment (``@v#.#``) for `juliainfo`.
+
+    >>> from types import SimpleNamespace
+    >>> info = SimpleNamespace(version_major=1, version_minor=6)
+    >>> default_project(info, {"JULIA_DEPOT_PATH": "/DEPOT"})
+    '/DEPOT/environments/v1.6'
+    """
+    name = "v{}.{}".format(juliainfo.version_major, juliainfo.version_minor)
+    depots = [d for d in environ.get("JULIA_DEPOT_PATH", "").split(os.pathsep) if d]
+    if not depots:
+        depots = [os.path.join(os.path.expanduser("~"), ".julia")]
+    candidates = [os.path.join(depot, "environments", name) for depot in depots]
+    for path in candidates:
+        if project_files(path)[0]:
+            return path
+    return candidates[0]
+
+
+def current_libpython():
+    """
+    libpython of this Python or the executable itself if statically linked.
+    """
+    return os.path.realpath(linked_libpython() or sys.executable)
+
+
+def realpath_or_empty(path):
+    return os.path.realpath(path) if path else ""
+
+
+def registry_key(julia_version, libjulia_path, libpython, pycall_version, project):
+    """
+    Registry key for a system image.  `project` is a `project_digest`.
+
+    >>> args = ("/lib/libjulia.so", "/lib/libpython.so", "1.95.1", "")
+    >>> registry_key("1.6.7", *args) == registry_key("1.6.7", *args)
+    True
+    >>> registry_key("1.6.7", *args) == registry_key("1.7.3", *args)
+    False
+    """
+    data = json.dumps(
+        [
+            julia_version,
+            realpath_or_empty(libjulia_path),
+            libpython,
+            pycall_version or "",
+            project,
+        ]
+    ).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_registry(path):
+    try:
+        with open(path) as f:
+            registry = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(registry, dict) or registry.get("format") != REGISTRY_FORMAT:
+        return {}
+    return registry.get("sysimages", {})
+
+
+def save_registry(path, sysimages):
+    dirname = os.path.dirname(path) or "."
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="tmp.", suffix=".json", dir=dirname)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(dict(format=REGISTRY_FORMAT, sysimages=sysimages), f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def register_sysimage(sysimage, juliainfo, project=None):
+    """
+    Register `sysimage` built for `juliainfo` and this Python.
+
+    `project` defaults to Julia's default environment (see
+    `default_project`).
+    `sysimage` should be a path which is not overwritten later (e.g.,
+    the copy in the system image cache).  Return the registry key or
+    `None` if the registry is disabled.
+    """
+    path = registry_path()
+    if path is None:
+        return None
+    sysimage = os.path.realpath(sysimage)
+    stat = os.stat(sysimage)
+    entry = dict(
+        sysimage=sysimage,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        julia_version=juliainfo.version_raw,
+        libjulia_path=realpath_or_empty(juliainfo.libjulia_path),
+        libpython=current_libpython(),
+        pycall_version=juliainfo.pycall_version or "",
+        project=project_digest(project or default_project(juliainfo)),
+        registered=time.time(),
+    )
+    key = registry_key(
+        entry["julia_version"],
+        entry["libjulia_path"],
+        entry["libpython"],
+        entry["pycall_version"],
+        entry["project"],
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # `file_lock` serializes concurrent processes and `_registry_lock`
+    # threads in this process (`flock` is per open file).
+    with _registry_lock, file_lock(path + ".lock"):
+        sysimages = load_registry(path)
+        sysimages[key] = entry
+        save_registry(path, sysimages)
+    logger.info("Registered system image %s", sysimage)
+    return key
+
+
+def is_valid_entry(entry):
+    """
+    Check (cheaply) that the registered system image is not modified.
+    """
+    try:
+        stat = os.stat(entry["sysimage"])
+    except (OSError, KeyError):
+        return False
+    return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get(
+        "mtime_ns"
+    )
+
+
+def lookup_sysimage(juliainfo, project=None):
+    """
+    Return the registered system image for `juliainfo` or `None`.
+
+    `project` defaults to `active_project` and then Julia's default
+    environment (see `default_project`).
+    """
+    path = registry_path()
+    if path is None or not os.path.exists(path):
+        return None
+    if project is None:
+        project = active_project() or default_project(juliainfo)
+    key = registry_key(
+        juliainfo.version_raw,
+        juliainfo.libjulia_path,
+        current_libpython(),
+        juliainfo.pycall_version,
+        project_digest(project),
+    )
+    entry = load_registry(path).get(key)
+    if entry is None:
+        logger.debug("No registered system image found in %s", path)
+        return None
+    if not is_valid_entry(entry):
+        logger.warning(
+            "Ignoring registered system image %s (removed or modified). "
+            "Using the default system image.",
+            entry.get("sysimage"),
+        )
+        return None
+    logger.debug("Using registered system image %s", entry["sysimage"])
+    return entry["sysimage"]
@@ -183,3 +183,12 @@ def test_jlpy_identity(name):
 @pytest.mark.parametrize("name", ["normal", "resize_b"])
 def test_pyjl_identity(name):
     assert py_name(jl_name(name)) == name
+
+
+def test_startup_profile(julia):
+    import json
+
+    profile = julia.startup_profile.as_dict()
+    names = [p["name"] for p in profile["phases"]]
+    assert {"pycall", "first_eval", "helper"} <= set(names)
+    assert json.loads(julia.startup_profile.to_json()) == profile
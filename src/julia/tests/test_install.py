@@ -53,3 +53,14 @@ def test_add_pycall(juliainfo):
 
     # julia.install() should add PyCall:
     install(julia=juliainfo.julia)
+
+
+@only_in_ci
+def test_install_packages(juliainfo, tmp_path):
+    project = str(tmp_path)
+    install(julia=juliainfo.julia, packages=["Printf"], project=project)
+
+    with open(os.path.join(project, "Project.toml")) as f:
+        deps = f.read()
+    assert "PyCall" in deps
+    assert "Printf" in deps
@@ -30,6 +30,7 @@ def test_juliainfo_normal():
     jlinfo = JuliaInfo.load(os.getenv("PYJULIA_TEST_RUNTIME", "julia"))
     check_core_juliainfo(jlinfo)
     assert os.path.exists(jlinfo.python)
+    assert jlinfo.pycall_version.count(".") == 2
     # Note: jlinfo.libpython is probably not a full path so we are not
     # testing it here.
 
@@ -66,6 +67,7 @@ def test_juliainfo_without_pycall(tmpdir):
     check_core_juliainfo(jlinfo)
     assert jlinfo.python is None
     assert jlinfo.libpython_path is None
+    assert jlinfo.pycall_version is None
     assert not jlinfo.is_pycall_built()
     assert not jlinfo.is_compatible_python()
 
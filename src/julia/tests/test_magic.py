@@ -1,4 +1,6 @@
+import os
 import sys
+import time
 from textwrap import dedent
 
 import pytest
@@ -135,6 +137,158 @@ def test_global_scope(run_cell):
     f()
     """) == "global"
     
+def test_cell_cache(julia_magics):
+    julia_magics.shell.user_ns["x"] = 1
+    assert julia_magics.julia(None, "$x + 1") == 2
+    cached = dict(julia_magics._cell_cache)
+    julia_magics.shell.user_ns["x"] = 2
+    assert julia_magics.julia(None, "$x + 1") == 3
+    assert dict(julia_magics._cell_cache) == cached
+
+def test_cell_cache_size(julia_magics):
+    julia_magics.cell_cache_size = 1
+    julia_magics.julia(None, "1")
+    julia_magics.julia(None, "2")
+    assert len(julia_magics._cell_cache) == 1
+
+def test_interp_py_str_per_occurrence(julia_magics):
+    calls = []
+    def f():
+        calls.append(len(calls))
+        return len(calls)
+    julia_magics.shell.user_ns["f"] = f
+    assert julia_magics.julia(None, '(py"f()", py"f()")') == (1, 2)
+    assert calls == [0, 1]
+
+def test_interp_name_once(julia_magics):
+    codes, _ = julia_magics._compile_cell('$x + $x + py"x"')
+    assert list(codes) == ["x", "x"]
+
+def test_interp_numpy_without_copy(julia_magics):
+    numpy = pytest.importorskip("numpy")
+    a = numpy.zeros(3)
+    julia_magics.shell.user_ns["a"] = a
+    julia_magics.julia(None, "$a[1] = 1.0;")
+    assert a[0] == 1.0
+
+def test_interp_numpy_as_array(julia_magics):
+    numpy = pytest.importorskip("numpy")
+    b = numpy.zeros((2, 3))
+    c = numpy.zeros((2, 3), order="F")
+    julia_magics.shell.user_ns.update(a=numpy.zeros(3), b=b, c=c)
+    assert julia_magics.julia(None, "$a isa Vector{Float64}")
+    assert julia_magics.julia(None, "$b isa Matrix{Float64} && size($b) == (2, 3)")
+    assert julia_magics.julia(None, "$c isa Matrix{Float64}")
+    julia_magics.julia(None, "$c[1, 2] = 1.0;")
+    assert c[0, 1] == 1.0
+    julia_magics.julia(None, "$b[1, 2] = 1.0;")  # C order: copied
+    assert b[0, 1] == 0.0
+
+def test_interp_numpy_readonly(julia_magics):
+    numpy = pytest.importorskip("numpy")
+    a = numpy.zeros(3)
+    a.flags.writeable = False
+    julia_magics.shell.user_ns["a"] = a
+    julia_magics.julia(None, "$a[1] = 1.0;")
+    assert a[0] == 0.0
+
+def test_time_allocs(julia_magics, capsys):
+    ans = julia_magics.julia("--time --allocs", "sum(rand(100))")
+    assert isinstance(ans, float)
+    out = capsys.readouterr().out
+    assert "Wall time:" in out
+    assert "Allocations:" in out
+
+def test_cell_line_text_ignored(julia_magics, capsys):
+    assert julia_magics.julia("a note", "1 + 1") == 2
+    assert julia_magics.julia("timed --time", "1 + 1") == 2
+    assert "Wall time:" in capsys.readouterr().out
+
+def test_profile(julia_magics, capsys):
+    # Long enough for the profiler to take samples inside `rand`:
+    cell = "sum(sum(rand(10^6)) for _ in 1:50)"
+    julia_magics.julia("--profile", cell)
+    flat = capsys.readouterr().out
+    assert "Count" in flat
+    assert "rand" in flat
+    julia_magics.julia("--profile=tree", cell)
+    tree = capsys.readouterr().out
+    assert "rand" in tree
+    assert tree != flat
+
+def skip_single_thread(julia_magics):
+    if not julia_magics._helper("background_threads")():
+        pytest.skip("Julia is not started with multiple threads")
+
+def test_background_single_thread(julia_magics):
+    from IPython.core.error import UsageError
+
+    if julia_magics._helper("background_threads")():
+        pytest.skip("Julia is started with multiple threads")
+    with pytest.raises(UsageError):
+        julia_magics.julia("--background", "1 + 1")
+
+def test_background(julia_magics):
+    skip_single_thread(julia_magics)
+    handle = julia_magics.julia("--background", "sleep(0.1); 1 + 1")
+    assert handle.status() in ("running", "done")
+    assert handle.result() == 2
+    assert handle.done()
+
+def test_background_not_on_main_thread(julia_magics):
+    skip_single_thread(julia_magics)
+    for _ in range(4):
+        handle = julia_magics.julia("--background", "Threads.threadid()")
+        assert handle.result() != 1
+
+def test_background_runs_while_idle(julia_magics):
+    skip_single_thread(julia_magics)
+    if not julia_magics._julia.api.supports_gc_safe():
+        pytest.skip("libjulia does not export jl_gc_safe_enter")
+    handle = julia_magics.julia("--background", """
+    s = 0
+    for _ in 1:20
+        s += sum(rand(10^5))  # allocates
+        GC.gc()
+    end
+    s > 0
+    """)
+    julia_magics._poll_background()  # post_execute: the kernel is idle
+    try:
+        # No Julia call here; a GC in the task would wait for this thread
+        # forever if it was not marked as GC-safe.
+        time.sleep(5)
+    finally:
+        julia_magics._leave_idle()  # pre_execute
+    assert handle.done()
+    assert handle.result()
+
+def test_background_await(julia_magics):
+    import asyncio
+
+    skip_single_thread(julia_magics)
+    handle = julia_magics.julia("--background", "2 + 3")
+    assert asyncio.run(handle.wait(interval=0.01)) == 5
+
+def test_background_error(julia_magics):
+    skip_single_thread(julia_magics)
+    handle = julia_magics.julia("--background", "error(\"bg\")")
+    with pytest.raises(Exception):
+        handle.result()
+    assert handle.status() == "failed"
+
+def test_display(julia_magics):
+    ans = julia_magics.julia("--display", "collect(1:10^6)")
+    assert isinstance(ans, magic.JuliaDisplay)
+    text = ans._show("text/plain")
+    assert text.startswith("1000000-element")
+    assert "⋮" in text
+    assert ans._repr_html_() is None
+    assert len(ans.value()) == 10**6
+
+def test_display_nothing(julia_magics):
+    assert julia_magics.julia("--display", "nothing") is None
+
 def test_noretvalue(run_cell):
     assert run_cell("""
     %%julia
@@ -172,6 +326,94 @@ def test_revise_error():
         revise.revise_errors = 0
 
 
+def test_revise_only_when_changed(tmp_path):
+    from julia.ipy import revise
+
+    src = tmp_path / "src.jl"
+    src.write_text("f() = 1")
+    state = [(1, 1, 0)]
+    watched = revise.WatchedFiles(lambda: [str(src)], lambda: state[0])
+    counter = [0]
+
+    def count():
+        counter[0] += 1
+
+    revise_wrapper = revise.make_revise_wrapper(count, watched)
+
+    revise.revise_errors = 0
+    try:
+        revise_wrapper()  # first cell always calls revise
+        revise_wrapper()
+        assert counter[0] == 1
+        assert revise.last_hook_stats["revise_time"] is None
+
+        os.utime(str(src), ns=(0, 0))
+        revise_wrapper()
+        assert counter[0] == 2
+        assert revise.last_hook_stats["revise_time"] is not None
+
+        state[0] = (2, 1, 0)  # e.g., `using NewPackage`
+        revise_wrapper()
+        revise_wrapper()
+        assert counter[0] == 3
+    finally:
+        revise.revise_errors = 0
+
+
+def test_revise_file_saved_while_revising(tmp_path):
+    from julia.ipy import revise
+
+    src = tmp_path / "src.jl"
+    src.write_text("f() = 1")
+    watched = revise.WatchedFiles(lambda: [str(src)], lambda: (1, 1, 0))
+    calls = []
+
+    def save_while_revising():
+        calls.append(None)
+        if len(calls) == 1:
+            src.write_text("f() = 22")
+
+    revise_wrapper = revise.make_revise_wrapper(save_while_revising, watched)
+    revise.revise_errors = 0
+    try:
+        revise_wrapper()
+        revise_wrapper()  # must pick up the change made during `revise`
+        assert len(calls) == 2
+    finally:
+        revise.revise_errors = 0
+
+
+def test_revise_same_mtime_different_size(tmp_path):
+    from julia.ipy import revise
+
+    src = tmp_path / "src.jl"
+    src.write_text("f() = 1")
+    os.utime(str(src), ns=(0, 0))
+    watched = revise.WatchedFiles(lambda: [str(src)], lambda: (1, 1, 0))
+    watched.snapshot()
+    assert not watched.changed()
+    src.write_text("f() = 22")
+    os.utime(str(src), ns=(0, 0))  # coarse mtime resolution
+    assert watched.changed()
+
+
+def test_revise_watch_broken():
+    from julia.ipy import revise
+
+    def fail():
+        raise RuntimeError("no watched_files")
+
+    state = [(1, 1, 0)]
+    watched = revise.WatchedFiles(lambda: [], lambda: state[0])
+    watched.snapshot()
+    assert not watched.changed()
+    watched.tracking_state = fail
+    with pytest.warns(UserWarning, match="no watched_files"):
+        assert watched.changed()
+    assert watched.broken
+    assert watched.changed()
+
+
 @pytest.mark.skipif(sys.version_info[0] < 3, reason="Python 2 not supported")
 def test_completions(julia):
     from IPython.core.completer import provisionalcompleter
@@ -182,3 +424,50 @@ def test_completions(julia):
     with provisionalcompleter():
         completions = jc.julia_completions(t, len(t))
     assert {"sin", "sign", "sizehint!"} <= {c.text for c in completions}
+
+
+@pytest.mark.skipif(sys.version_info[0] < 3, reason="Python 2 not supported")
+def test_completions_cached(julia, monkeypatch):
+    from IPython.core.completer import provisionalcompleter
+    from julia.ipy.monkeypatch_completer import JuliaCompleter
+
+    jc = JuliaCompleter(julia)
+    t = "%julia Base.si"
+    with provisionalcompleter():
+        jc.julia_completions(t, len(t))
+        assert len(jc.cache) == 1
+
+        def fail(*_):
+            raise AssertionError("REPL.completions must not be called")
+
+        monkeypatch.setattr(JuliaCompleter, "jlcomplete", fail)
+        completions = jc.julia_completions(t + "g", len(t) + 1)
+    assert {"sign", "signbit"} <= {c.text for c in completions}
+    assert "sin" not in {c.text for c in completions}
+    assert all(c.start == len("%julia Base.") for c in completions)
+
+
+def test_completions_staleness_bounded():
+    pytest.importorskip("IPython")
+    from julia.ipy.monkeypatch_completer import JuliaCompleter
+
+    jc = JuliaCompleter(julia=object(), latency_budget=0.1, max_staleness=5.0)
+    jc.store("si", 2, ["sin", "sign"], 0, state=(1,), query_time=1.0)
+    assert jc.cached_completions("sig", 3, (2,)) == (["sign"], 0)
+    jc.cache[("", "")]["queried"] -= 10
+    assert jc.cached_completions("sig", 3, (2,)) is None
+    assert jc.cached_completions("sig", 3, (1,)) == (["sign"], 0)
+
+
+@pytest.mark.skipif(sys.version_info[0] < 3, reason="Python 2 not supported")
+def test_completions_invalidated(julia):
+    from IPython.core.completer import provisionalcompleter
+    from julia.ipy.monkeypatch_completer import JuliaCompleter
+
+    jc = JuliaCompleter(julia)
+    t = "%julia pyjulia_completion_"
+    with provisionalcompleter():
+        assert not jc.julia_completions(t, len(t))
+        julia.eval("pyjulia_completion_test = 1")
+        completions = jc.julia_completions(t + "t", len(t) + 1)
+    assert "pyjulia_completion_test" in {c.text for c in completions}
@@ -0,0 +1,7 @@
+from julia import precompile_workload
+
+
+def test_run(julia):
+    # `precompile.jl` ignores errors in the workload; make sure it works:
+    precompile_workload.run()
+    assert list(julia.eval("Main.pyjulia_precompile_value")) == [1.0]
@@ -0,0 +1,83 @@
+import io
+import os
+import threading
+
+import pytest
+
+from julia.server import (
+    JuliaServer,
+    KnownError,
+    default_socket_path,
+    private_directory,
+    request,
+)
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Unix domain socket required")
+
+
+@pytest.fixture
+def server(tmp_path):
+    # Julia is not required for running Python programs:
+    server = JuliaServer(str(tmp_path / "server.sock"), julia=None)
+    thread = threading.Thread(target=server.serve_until_stopped)
+    thread.start()
+    yield server
+    request(dict(op="stop"), socket_path=server.server_address)
+    thread.join()
+
+
+def run(server, **args):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    code = request(
+        dict(op="python", cwd=os.getcwd(), args=args),
+        socket_path=server.server_address,
+        stdout=stdout,
+        stderr=stderr,
+    )
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_run_command(server):
+    code, out, _ = run(
+        server, command="import sys; print('hello', sys.argv[1:])", args=["a"]
+    )
+    assert code == 0
+    assert out == "hello ['a']\n"
+
+
+def test_exit_code(server):
+    code, _, err = run(server, command="raise SystemExit(3)")
+    assert code == 3
+    code, _, err = run(server, command="1 / 0")
+    assert code == 1
+    assert "ZeroDivisionError" in err
+
+
+def test_source(server):
+    code, out, _ = run(server, source="print(__name__)")
+    assert (code, out) == (0, "__main__\n")
+
+
+def test_default_socket_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("PYJULIA_SERVER_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket_path() == str(tmp_path / "pyjulia-server.sock")
+
+
+def test_private_directory(tmp_path):
+    path = str(tmp_path / "private")
+    assert private_directory(path) == path
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+    os.chmod(path, 0o755)
+    with pytest.raises(KnownError):
+        private_directory(path)
+
+
+def test_not_removing_non_socket(tmp_path):
+    path = tmp_path / "server.sock"
+    path.write_text("not a socket")
+    with pytest.raises(KnownError):
+        JuliaServer(str(path), julia=None)
+    assert path.read_text() == "not a socket"
@@ -4,13 +4,28 @@ from subprocess import check_call
 
 import pytest
 
-from julia.sysimage import build_sysimage
+from julia.sysimage import (
+    SysimageBuild,
+    build_sysimage,
+    merge_precompile_statements,
+    project_files,
+    sysimage_key,
+    sysimage_key_inputs,
+)
 
 from ..tools import build_pycall
 from .test_compatible_exe import runcode
+from .test_juliainfo import dummy_juliainfo
 from .utils import only_in_ci, skip_in_apple, skip_in_windows
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    # Do not register the system images built here in the user's
+    # registry (see `julia.sysimage_registry`):
+    monkeypatch.setenv("PYJULIA_CACHE_DIR", str(tmp_path / "pyjulia-cache"))
+
+
 def skip_early_julia_versions(juliainfo):
     if juliainfo.version_info < (1, 3, 1):
         pytest.skip("Julia < 1.3.1 is not supported")
@@ -90,3 +105,75 @@ def test_build_with_basesysimage_and_load(tmpdir, juliainfo):
     )
 
     assert_sample_julia_code_runs(juliainfo, sysimage_path)
+
+
+def test_merge_precompile_statements(tmp_path):
+    traces = tmp_path / "traces"
+    traces.mkdir()
+    (traces / "precompile-1.jl").write_text(
+        "precompile(Tuple{typeof(Base.sum), Array{Int64, 1}})\n"
+        "precompile(Tuple{typeof(Base.sin), Float64})\n"
+    )
+    (traces / "precompile-2.jl").write_text(
+        "precompile(Tuple{typeof(Base.sin), Float64})\n"
+        "# comment\n"
+        "precompile(Tuple{typeof(Base.cos), Float64})\n"
+    )
+    output = tmp_path / "statements.jl"
+
+    n = merge_precompile_statements([str(traces)], str(output))
+
+    assert n == 3
+    assert output.read_text().splitlines() == [
+        "precompile(Tuple{typeof(Base.sum), Array{Int64, 1}})",
+        "precompile(Tuple{typeof(Base.sin), Float64})",
+        "precompile(Tuple{typeof(Base.cos), Float64})",
+    ]
+
+
+def test_project_files(tmp_path):
+    assert project_files(str(tmp_path)) == ("", "")
+
+    (tmp_path / "Project.toml").write_text("")
+    (tmp_path / "JuliaManifest.toml").write_text("")
+    assert project_files(str(tmp_path)) == (
+        str(tmp_path / "Project.toml"),
+        str(tmp_path / "JuliaManifest.toml"),
+    )
+
+
+def test_sysimage_key_pycall_version(tmp_path):
+    def key(pycall_version):
+        return sysimage_key(
+            sysimage_key_inputs(
+                juliainfo=dummy_juliainfo(
+                    sysimage=os.devnull, pycall_version=pycall_version
+                ),
+                julia_py="julia-py",
+                script=os.devnull,
+                statements_file="",
+                base_sysimage=None,
+                compiler_env=str(tmp_path),
+            )
+        )
+
+    assert key("1.95.1") == key("1.95.1")
+    assert key("1.95.1") != key("1.96.0")
+
+
+def test_stage1_shared_by_output_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "julia.sysimage.JuliaInfo.load",
+        lambda julia: dummy_juliainfo(sysimage=os.devnull),
+    )
+    monkeypatch.setattr("julia.sysimage.julia_py_executable", lambda: "julia-py")
+
+    def build(output):
+        return SysimageBuild(
+            str(tmp_path), output, "julia", os.devnull, compiler_env=str(tmp_path)
+        )
+
+    assert (
+        build("sys.so").stage1_cached
+        == build(str(tmp_path / "pycall.so")).stage1_cached
+    )
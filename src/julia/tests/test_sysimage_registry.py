@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+
+from julia.sysimage_registry import lookup_sysimage, register_sysimage
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / "registry.json"
+    monkeypatch.setenv("PYJULIA_SYSIMAGE_REGISTRY", str(path))
+    monkeypatch.delenv("JULIA_PROJECT", raising=False)
+    monkeypatch.setenv("JULIA_DEPOT_PATH", str(tmp_path / "depot"))
+    return path
+
+
+def make_juliainfo(tmp_path, version_raw="1.6.7", pycall_version="1.95.1"):
+    libjulia = tmp_path / "libjulia.so"
+    libjulia.write_bytes(b"")
+    major, minor, _ = version_raw.split(".")
+    return SimpleNamespace(
+        version_raw=version_raw,
+        version_major=int(major),
+        version_minor=int(minor),
+        libjulia_path=str(libjulia),
+        pycall_version=pycall_version,
+    )
+
+
+def test_register_and_lookup(tmp_path, registry):
+    juliainfo = make_juliainfo(tmp_path)
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+
+    assert lookup_sysimage(juliainfo) is None
+    register_sysimage(str(sysimage), juliainfo)
+    assert registry.exists()
+    assert lookup_sysimage(juliainfo) == str(sysimage.resolve())
+    assert lookup_sysimage(make_juliainfo(tmp_path, "1.7.3")) is None
+
+
+def test_lookup_project(tmp_path, registry):
+    juliainfo = make_juliainfo(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "Project.toml").write_text("[deps]\n")
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+    register_sysimage(str(sysimage), juliainfo, str(project))
+
+    assert lookup_sysimage(juliainfo) is None
+    assert lookup_sysimage(juliainfo, str(project)) == str(sysimage.resolve())
+
+    (project / "Project.toml").write_text('[deps]\nPyCall = "..."\n')
+    assert lookup_sysimage(juliainfo, str(project)) is None
+
+
+def test_lookup_default_environment(tmp_path, registry):
+    juliainfo = make_juliainfo(tmp_path)
+    env = tmp_path / "depot" / "environments" / "v1.6"
+    env.mkdir(parents=True)
+    (env / "Project.toml").write_text('[deps]\nPyCall = "..."\n')
+    (env / "Manifest.toml").write_text("")
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+    register_sysimage(str(sysimage), juliainfo)
+    assert lookup_sysimage(juliainfo) == str(sysimage.resolve())
+
+    (env / "Manifest.toml").write_text("# e.g., `Pkg.update()`")
+    assert lookup_sysimage(juliainfo) is None
+
+
+def test_lookup_pycall_version(tmp_path, registry):
+    juliainfo = make_juliainfo(tmp_path)
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+    register_sysimage(str(sysimage), juliainfo)
+
+    assert lookup_sysimage(make_juliainfo(tmp_path, pycall_version="1.96.0")) is None
+
+
+def test_lookup_modified_sysimage(tmp_path, registry):
+    juliainfo = make_juliainfo(tmp_path)
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+    register_sysimage(str(sysimage), juliainfo)
+
+    sysimage.write_bytes(b"modified sysimage")
+    assert lookup_sysimage(juliainfo) is None
+
+
+def test_registry_disabled(tmp_path, registry, monkeypatch):
+    juliainfo = make_juliainfo(tmp_path)
+    sysimage = tmp_path / "sys.so"
+    sysimage.write_bytes(b"sysimage")
+    register_sysimage(str(sysimage), juliainfo)
+
+    monkeypatch.setenv("PYJULIA_SYSIMAGE_REGISTRY", "no")
+    assert lookup_sysimage(juliainfo) is None
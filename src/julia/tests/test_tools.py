@@ -1,11 +1,19 @@
 import glob
+import io
 import os
 import platform
 import sysconfig
 
 import pytest
 
-from julia.tools import _non_default_julia_warning_message, julia_py_executable
+from julia.tools import (
+    _non_default_julia_warning_message,
+    fingerprint_environ,
+    is_installed,
+    julia_py_executable,
+    make_receiver,
+    save_install_fingerprint,
+)
 
 fake_user = "fa9a5150-8e17-11ea-3f8d-ff1e5ae4a251"
 posix_user_sample_path = os.path.join(os.sep, "home", fake_user, ".local", "bin")
@@ -86,3 +94,62 @@ def test_find_julia_py_executable_not_found(monkeypatch):
 def test_non_default_julia_warning_message():
     msg = _non_default_julia_warning_message("julia1.5")
     assert "Julia(runtime='julia1.5')" in msg
+
+
+def test_make_receiver_split_utf8():
+    out = io.StringIO()
+    receiver = make_receiver(out)
+    data = "α β".encode("utf-8")
+    receiver(data[:1])
+    receiver(data[1:4])
+    assert out.getvalue() == "α "
+    receiver(data[4:])
+    assert out.getvalue() == "α β"
+
+
+def test_install_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYJULIA_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("JULIA_PROJECT", raising=False)
+    julia = tmp_path / "julia"
+    julia.write_text("")
+    project = tmp_path / "env" / "Project.toml"
+    project.parent.mkdir()
+    project.write_text("")
+    manifest = project.parent / "Manifest.toml"
+    manifest.write_text("")
+    deps = tmp_path / "deps.jl"
+    deps.write_text("")
+    infofile = tmp_path / "info.txt"
+    infofile.write_text("1.6.7\n{}\n{}\n".format(project, deps))
+    args = (str(julia), "/usr/bin/python3", "/usr/lib/libpython3.so")
+
+    assert not is_installed(*args)
+    save_install_fingerprint(*args, infofile=str(infofile))
+    assert is_installed(*args)
+    assert not is_installed(str(julia), "/usr/bin/python2", args[2])
+
+    manifest.write_text("[[PyCall]]")  # e.g., `Pkg.rm("PyCall")`
+    assert not is_installed(*args)
+    save_install_fingerprint(*args, infofile=str(infofile))
+    assert is_installed(*args)
+
+    assert not is_installed(*args, packages=["Example"])
+    save_install_fingerprint(*args, infofile=str(infofile), packages=["Example"])
+    assert is_installed(*args, packages=["Example"])
+    assert not is_installed(*args)
+
+    deps.unlink()
+    assert not is_installed(*args)
+
+
+def test_fingerprint_environ_current_project(tmp_path, monkeypatch):
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "Project.toml").write_text("")
+    monkeypatch.setenv("JULIA_PROJECT", "@.")
+    monkeypatch.chdir(tmp_path / "a")
+    env_a = fingerprint_environ()
+    monkeypatch.chdir(tmp_path / "b")
+    env_b = fingerprint_environ()
+    assert env_a["JULIA_PROJECT"] == os.path.realpath(str(tmp_path / "a"))
+    assert env_a != env_b
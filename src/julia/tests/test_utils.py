@@ -6,7 +6,8 @@ import os
 
 import pytest
 
-from julia.core import UnsupportedPythonError
+from julia.core import UnsupportedPythonError, build_static_python_sysimage
+from julia.utils import file_lock
 
 from .test_compatible_exe import runcode
 from .utils import _retry_on_failure, retry_failing_if_windows
@@ -22,6 +23,42 @@ def dummy_juliainfo():
     return SimpleNamespace(julia="julia", python=somepath, libpython_path=somepath)
 
 
+def static_python_juliainfo(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYJULIA_CACHE_DIR", str(tmp_path))
+    jlinfo = dummy_juliainfo()
+    jlinfo.version_raw = "1.6.7"
+    return jlinfo
+
+
+def test_static_python_sysimage_missing_julia_py(tmp_path, monkeypatch):
+    def build_sysimage(*_, **__):
+        raise RuntimeError("``julia-py`` executable is not found")
+
+    monkeypatch.setattr("julia.sysimage.build_sysimage", build_sysimage)
+    monkeypatch.setattr("julia.core.lookup_sysimage", lambda _: None)
+    jlinfo = static_python_juliainfo(tmp_path, monkeypatch)
+    with pytest.raises(UnsupportedPythonError):
+        build_static_python_sysimage(jlinfo)
+
+
+def test_static_python_sysimage_built_concurrently(tmp_path, monkeypatch):
+    def build_sysimage(*_, **__):
+        raise AssertionError("should not build")
+
+    monkeypatch.setattr("julia.sysimage.build_sysimage", build_sysimage)
+    monkeypatch.setattr("julia.core.lookup_sysimage", lambda _: "sys.so")
+    jlinfo = static_python_juliainfo(tmp_path, monkeypatch)
+    assert build_static_python_sysimage(jlinfo) == "sys.so"
+
+
+def test_file_lock(tmp_path):
+    path = str(tmp_path / "lock")
+    with file_lock(path):
+        assert os.path.exists(path)
+    with file_lock(path):
+        pass
+
+
 def test_unsupported_python_error_statically_linked():
     jlinfo = dummy_juliainfo()
     err = UnsupportedPythonError(jlinfo)
@@ -73,3 +110,10 @@ def check_atexit():
         '''
     )
     assert "atexit called" in proc.stdout
+
+
+def test_cache_dir(monkeypatch, tmp_path):
+    from julia.utils import cache_dir
+
+    monkeypatch.setenv("PYJULIA_CACHE_DIR", str(tmp_path))
+    assert cache_dir("a", "b") == os.path.join(str(tmp_path), "a", "b")
@@ -1,14 +1,20 @@
 from __future__ import absolute_import, print_function
 
+import codecs
 import glob
+import hashlib
+import json
 import os
 import re
 import subprocess
 import sys
 import sysconfig
+import tempfile
 
 from .core import JuliaNotFound, which
 from .find_libpython import linked_libpython
+from .sysimage_registry import active_project, project_files, realpath_or_empty
+from .utils import cache_dir, env_disabled
 
 
 class PyCallInstallError(RuntimeError):
@@ -32,6 +38,20 @@ Some useful information may also be stored in the build log file
             )
 
 
+class PackageInstallError(RuntimeError):
+    def __init__(self, op, packages, output=None):
+        self.op = op
+        self.packages = packages
+        self.output = output
+
+    def __str__(self):
+        what = ", ".join(self.packages) if self.packages else "the project"
+        msg = "{} {} failed.".format(self.op, what)
+        if self.output:
+            msg += " Output:\n\n{}".format(self.output)
+        return msg
+
+
 def _julia_version(julia):
     output = subprocess.check_output([julia, "--version"], universal_newlines=True)
     match = re.search(r"([0-9]+)\.([0-9]+)\.([0-9]+)", output)
@@ -52,14 +72,126 @@ def _non_default_julia_warning_message(julia):
     ).format(julia=julia)
 
 
+# Environment variables changing the PyCall found by `julia`:
+FINGERPRINT_ENVIRON = ["JULIA_PROJECT", "JULIA_LOAD_PATH", "JULIA_DEPOT_PATH", "PYTHON"]
+
+
+def install_cache_enabled(environ=os.environ):
+    """
+    >>> install_cache_enabled({})
+    True
+    >>> install_cache_enabled({"PYJULIA_INSTALL_CACHE": "no"})
+    False
+    """
+    return not env_disabled("PYJULIA_INSTALL_CACHE", environ)
+
+
+def file_stamp(path):
+    """
+    Size and modification time of `path` (or `None` if it does not exist).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def fingerprint_environ(environ=os.environ):
+    """
+    Environment variables in `FINGERPRINT_ENVIRON`, with ``JULIA_PROJECT``
+    resolved against the current directory (e.g., for ``@.``).
+
+    >>> fingerprint_environ({"PYTHON": "python3"})["PYTHON"]
+    'python3'
+    """
+    values = {name: environ.get(name) for name in FINGERPRINT_ENVIRON}
+    if values["JULIA_PROJECT"]:
+        project = active_project(environ)
+        values["JULIA_PROJECT"] = project and os.path.abspath(project)
+    return values
+
+
+def install_fingerprint(julia_path, python, libpython, info, packages=()):
+    """
+    Return a JSON-compatible fingerprint of the installation of PyCall
+    and `packages`.
+
+    It is computed without running Julia.  `info` is the information
+    recorded by ``install.jl`` (see `read_install_info`).
+    """
+    project = info["project"]
+    return dict(
+        julia=julia_path,
+        julia_stamp=file_stamp(julia_path),
+        julia_version=info["julia_version"],
+        python=python,
+        libpython=libpython,
+        environ=fingerprint_environ(),
+        project=project,
+        project_stamps=[
+            file_stamp(path)
+            for path in (project_files(os.path.dirname(project)) if project else ())
+        ],
+        pycall_deps=info["pycall_deps"],
+        pycall_deps_stamp=file_stamp(info["pycall_deps"]),
+        packages=sorted(packages),
+    )
+
+
+def read_install_info(path):
+    with open(path) as f:
+        lines = f.read().splitlines()
+    if len(lines) != 3:
+        return None
+    return dict(zip(["julia_version", "project", "pycall_deps"], lines))
+
+
+def install_cache_path(julia_path, python, project=""):
+    data = json.dumps([julia_path, python, project]).encode("utf-8")
+    name = hashlib.sha256(data).hexdigest()[:16] + ".json"
+    return cache_dir("install", name)
+
+
+def is_installed(julia_path, python, libpython, project="", packages=()):
+    """
+    Check if PyCall is built for `python` and unchanged since the last
+    successful `install` (with `project` and `packages`).
+    """
+    try:
+        with open(install_cache_path(julia_path, python, project)) as f:
+            cached = json.load(f)
+        info = cached["info"]
+        return cached["fingerprint"] == install_fingerprint(
+            julia_path, python, libpython, info, packages
+        )
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def save_install_fingerprint(
+    julia_path, python, libpython, project="", infofile="", packages=()
+):
+    info = read_install_info(infofile)
+    if info is None:
+        return
+    path = install_cache_path(julia_path, python, project)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fingerprint = install_fingerprint(julia_path, python, libpython, info, packages)
+    with open(path, "w") as f:
+        json.dump(dict(info=info, fingerprint=fingerprint), f, indent=2)
+
+
 def build_pycall(julia="julia", python=sys.executable, **kwargs):
     # Passing `python` to force build (OP="build")
     install(julia=julia, python=python, **kwargs)
 
 
-def install(julia="julia", color="auto", python=None, quiet=False):
+def install(
+    julia="julia", color="auto", python=None, quiet=False, packages=(), project=None
+):
     """
-    install(*, julia="julia", color="auto")
+    install(*, julia="julia", color="auto", packages=(), project=None)
     Install Julia packages required by PyJulia in `julia`.
 
     This function installs and/or re-builds PyCall if necessary.  It
@@ -73,13 +205,35 @@ def install(julia="julia", color="auto", python=None, quiet=False):
     color : "auto", False or True
         Use colorful output if `True`.  "auto" (default) to detect it
         automatically.
+    packages : list of str
+        Additional Julia packages to be installed.  A package can be
+        given as ``"Name"`` or ``"Name@version"``.  They are added in
+        one `Pkg.add` call and then precompiled together with the other
+        packages in the project in parallel (Julia >= 1.6).
+    project : str
+        Path to a Julia project.  If given, its manifest is
+        instantiated and PyCall and `packages` are installed into it.
+        Otherwise, the default Julia environment (or ``JULIA_PROJECT``)
+        is used.
+
+    When PyCall and `packages` are installed successfully, a
+    fingerprint of the Julia executable, the Julia project, PyCall's
+    build, `packages` and this Python is stored in the PyJulia cache
+    directory.  The next call returns
+    immediately without running Julia if the fingerprint is unchanged.
+    Set the environment variable ``PYJULIA_INSTALL_CACHE`` to ``no`` to
+    disable it.  Passing `python` (e.g., via `build_pycall`) always
+    re-builds PyCall.
     """
-    if which(julia) is None:
+    julia_path = which(julia)
+    if julia_path is None:
         raise JuliaNotFound(julia, kwargname="julia")
-
-    libpython = linked_libpython() or ""
+    julia_path = os.path.realpath(julia_path)
 
     julia_cmd = [julia, "--startup-file=no"]
+    if project:
+        project = os.path.realpath(project)
+        julia_cmd.append("--project=" + project)
     if quiet:
         color = False
     if color == "auto":
@@ -94,6 +248,49 @@ def install(julia="julia", color="auto", python=None, quiet=False):
             julia_cmd.append("--color=yes")
         """
 
+    packages = list(packages)
+    libpython = linked_libpython() or ""
+    fingerprint_args = (
+        julia_path,
+        os.path.realpath(python or sys.executable),
+        realpath_or_empty(libpython),
+        project or "",
+    )
+    use_cache = install_cache_enabled() and not python
+    if use_cache and is_installed(*fingerprint_args, packages=packages):
+        if not quiet:
+            names = ", ".join(["PyCall"] + packages)
+            print("{} already installed (cached).".format(names), file=sys.stderr)
+        return
+
+    if use_cache:
+        fd, infofile = tempfile.mkstemp(prefix="pyjulia-install-", suffix=".txt")
+        os.close(fd)
+    else:
+        infofile = ""
+    try:
+        if packages or project:
+            # Resolve everything, including PyCall, in one `Pkg` operation
+            # before checking PyCall's build.
+            _install_packages(
+                julia_cmd, "resolve", packages, project, quiet, python=python
+            )
+
+        _install_pycall(julia, julia_cmd, python, libpython, infofile, quiet)
+
+        if packages or project:
+            _install_packages(julia_cmd, "precompile", packages, project, quiet)
+
+        if use_cache:
+            save_install_fingerprint(
+                *fingerprint_args, infofile=infofile, packages=packages
+            )
+    finally:
+        if infofile:
+            os.remove(infofile)
+
+
+def _install_pycall(julia, julia_cmd, python, libpython, infofile, quiet):
     OP = "build" if python else "install"
     install_cmd = julia_cmd + [
         "--",
@@ -101,8 +298,42 @@ def install(julia="julia", color="auto", python=None, quiet=False):
         OP,
         python or sys.executable,
         libpython,
+        infofile,
+    ]
+    _install(julia, julia_cmd, install_cmd, quiet)
+
+
+def _install_packages(julia_cmd, op, packages, project, quiet, python=None):
+    cmd = julia_cmd + [
+        "--",
+        os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), "install_packages.jl"
+        ),
+        op,
+        "yes" if project else "",
     ]
+    cmd.extend(packages)
+
+    env = dict(os.environ)
+    # Precompile once in the "precompile" step (after building PyCall):
+    env["JULIA_PKG_PRECOMPILE_AUTO"] = "0"
+    # PyCall added in the "resolve" step is built for this Python:
+    env["PYTHON"] = python or sys.executable
+
+    kwargs = {}
+    if quiet:
+        kwargs.update(
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True
+        )
+    proc = subprocess.Popen(cmd, env=env, **kwargs)
+    output, _ = proc.communicate()
+    if proc.returncode != 0:
+        raise PackageInstallError(
+            "Installing" if op == "resolve" else "Precompiling", packages, output
+        )
+
 
+def _install(julia, julia_cmd, install_cmd, quiet):
     kwargs = {}
     if quiet:
         kwargs.update(
@@ -135,24 +366,71 @@ def install(julia="julia", color="auto", python=None, quiet=False):
 
 
 def make_receiver(io):
-    def receiver(s):
-        io.write(s)
+    """
+    Make a receiver of Julia's output (`bytes`) writing it to `io`.
+    """
+    # A batch of output may end in the middle of a UTF-8 sequence:
+    decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+
+    def receiver(data):
+        io.write(decode(data))
         io.flush()
 
     return receiver
 
 
-def redirect_output_streams():
+def uses_fd(io, fd):
+    """
+    Check if the Python stream `io` writes to the file descriptor `fd`.
+
+    >>> import io
+    >>> uses_fd(io.StringIO(), 1)
+    False
+    """
+    try:
+        return io.fileno() == fd
+    except (AttributeError, ValueError, OSError):
+        # `io.UnsupportedOperation` is a subclass of `OSError`
+        return False
+
+
+def redirect_output_streams(flush_bytes=4096, flush_interval=0.05, max_buffer=2**20):
     """
     Redirect Julia's stdout and stderr to Python's counter parts.
+
+    Julia's output is forwarded in batches of `flush_bytes` bytes or
+    every `flush_interval` seconds while Julia is running.  At most
+    `max_buffer` bytes are buffered; Julia blocks on writing output
+    while Python is busy.  Streams already connected to Julia's file
+    descriptor (e.g., in terminal IPython) are not redirected.
+
+    Return `True` if any stream is redirected.
     """
 
     from .Main._PyJuliaHelper.IOPiper import pipe_std_outputs
 
-    pipe_std_outputs(make_receiver(sys.stdout), make_receiver(sys.stderr))
+    receivers = [
+        None if uses_fd(io, fd) else make_receiver(io)
+        for io, fd in [(sys.stdout, 1), (sys.stderr, 2)]
+    ]
+    # Note: Redirecting a stream using the same file descriptor as
+    # Julia forwards the output to itself forever.
+    pipe_std_outputs(
+        *receivers,
+        flush_bytes=flush_bytes,
+        flush_interval=flush_interval,
+        max_buffer=max_buffer
+    )
+    return any(r is not None for r in receivers)
+
+
+def flush_julia_output():
+    """
+    Forward the output of Julia buffered by `redirect_output_streams`.
+    """
+    from .Main._PyJuliaHelper.IOPiper import flush_pending
 
-    # TODO: Invoking `redirect_output_streams()` in terminal IPython
-    # terminates the whole Python process.  Find out why.
+    flush_pending()
 
 
 def julia_py_executable():
@@ -3,6 +3,7 @@ from __future__ import absolute_import, print_function
 import os
 import subprocess
 import sys
+from contextlib import contextmanager
 
 is_linux = sys.platform.startswith("linux")
 is_windows = os.name == "nt"
@@ -26,3 +27,73 @@ else:
 
 PYCALL_PKGID = """\
 Base.PkgId(Base.UUID("438e738f-606a-5dbb-bf0a-cddfbfd45ab0"), "PyCall")"""
+
+
+def cache_dir(*paths):
+    """
+    Path under the directory for files cached by PyJulia.
+
+    It is taken from the environment variable ``PYJULIA_CACHE_DIR`` if
+    set.  Otherwise, a ``pyjulia`` directory in the platform-specific
+    user cache directory is used.
+    """
+    root = os.environ.get("PYJULIA_CACHE_DIR")
+    if not root:
+        if is_windows:
+            base = os.environ.get("LOCALAPPDATA") or os.path.join(
+                os.path.expanduser("~"), "AppData", "Local"
+            )
+        elif is_apple:
+            base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+                os.path.expanduser("~"), ".cache"
+            )
+        root = os.path.join(base, "pyjulia")
+    return os.path.join(root, *paths)
+
+
+def env_disabled(name, environ=os.environ):
+    """
+    Check if the environment variable `name` is set to "no", "0" or "false".
+
+    >>> env_disabled("PYJULIA_X", {})
+    False
+    >>> env_disabled("PYJULIA_X", {"PYJULIA_X": "No"})
+    True
+    >>> env_disabled("PYJULIA_X", {"PYJULIA_X": "/some/path"})
+    False
+    """
+    return environ.get(name, "").lower() in ("no", "0", "false")
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on the file `path` (created if missing).
+
+    Unlike `threading.Lock`, this serializes concurrent processes.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if is_windows:
+            import msvcrt
+
+            while True:
+                try:
+                    # Note: `LK_LOCK` gives up after 10 seconds.
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+    finally:
+        os.close(fd)